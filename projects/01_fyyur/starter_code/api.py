@@ -0,0 +1,256 @@
+#----------------------------------------------------------------------------#
+# JSON API, version 1 (/api/v1).
+#
+# Mirrors the venue, artist and show pages for non-browser clients:
+# - ?fields=id,name returns only those fields, and only their columns are read
+# - lists are paged by keyset: ?limit= and ?after=<next of the previous page>
+# - responses carry a weak ETag of their body, If-None-Match is answered with 304
+# - bodies of API_COMPRESS_MIN_BYTES and more are compressed with brotli (if the
+#   package is installed) or gzip, whichever the client accepts
+# - bodies are encoded with orjson if it is installed, with json otherwise
+# Resources are served in the shape of the HTML pages' data; the shows of a
+# venue or artist are listed at /shows?venue_id= / ?artist_id=.
+#----------------------------------------------------------------------------#
+
+import gzip
+import json
+from datetime import datetime
+from functools import lru_cache
+
+from flask import Blueprint, Response, abort, current_app, request
+from werkzeug.exceptions import HTTPException
+
+from models import db, Show, Genre, Venue, Artist, venue_genres, artist_genres
+
+bp = Blueprint('api', __name__, url_prefix='/api/v1')
+
+VENUE_FIELDS = {
+  column: getattr(Venue, column) for column in (
+    'id', 'name', 'city', 'state', 'address', 'phone', 'website', 'image_link', 'facebook_link',
+    'seeking_talent', 'seeking_description', 'upcoming_shows_count')
+}
+
+ARTIST_FIELDS = {
+  column: getattr(Artist, column) for column in (
+    'id', 'name', 'city', 'state', 'phone', 'website', 'image_link', 'facebook_link',
+    'seeking_venue', 'seeking_description', 'upcoming_shows_count')
+}
+
+SHOW_FIELDS = {
+  'id': Show.id,
+  'start_time': Show.start_time,
+  'venue_id': Show.venue_id,
+  'artist_id': Show.artist_id,
+  'venue_name': Venue.name,
+  'artist_name': Artist.name,
+  'artist_image_link': Artist.image_link,
+}
+
+#----------------------------------------------------------------------------#
+# Encoding.
+#----------------------------------------------------------------------------#
+
+@lru_cache(maxsize=None)
+def json_encoder():
+  """
+    Returns a function encoding data as compact JSON bytes, orjson's if it is installed
+  """
+  try:
+    import orjson
+  except ImportError:
+    encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False,
+                               default=lambda value: value.isoformat())
+    return lambda data: encoder.encode(data).encode('utf-8')
+  return orjson.dumps
+
+def compress(response):
+  """
+    Compresses the body of response with the best encoding the client accepts
+  """
+  response.vary.add('Accept-Encoding')
+  body = response.get_data()
+  if len(body) < current_app.config['API_COMPRESS_MIN_BYTES']:
+    return
+  accepted = request.accept_encodings
+  if accepted['br']:
+    try:
+      import brotli
+    except ImportError:
+      pass
+    else:
+      response.set_data(brotli.compress(body, quality=current_app.config['API_BROTLI_QUALITY']))
+      response.content_encoding = 'br'
+      return
+  if accepted['gzip']:
+    response.set_data(gzip.compress(body, compresslevel=current_app.config['API_GZIP_LEVEL']))
+    response.content_encoding = 'gzip'
+
+def api_response(data, status=200):
+  """
+    Returns data as JSON response with ETag, answering If-None-Match with 304
+  """
+  response = Response(json_encoder()(data), status=status, mimetype='application/json')
+  if status == 200:
+    response.add_etag(weak=True)
+    response.make_conditional(request)
+  if response.status_code != 304:
+    compress(response)
+  return response
+
+# by code as well, since the app's own 404 and 500 handlers (views.py) take
+# precedence over a blueprint handler registered for a class only
+@bp.errorhandler(HTTPException)
+@bp.errorhandler(404)
+@bp.errorhandler(500)
+def api_error(error):
+  return api_response({'success': False, 'error': error.code, 'message': error.description}, error.code)
+
+#----------------------------------------------------------------------------#
+# Query arguments.
+#----------------------------------------------------------------------------#
+
+def selected_fields(available, extra=()):
+  """
+    Returns the names of the fields given by ?fields=, all of them without it:
+    - available: {name: column} of the resource
+    - extra: names of fields that are not columns (e.g. genres)
+  """
+  names = list(available) + list(extra)
+  fields = request.args.get('fields')
+  if not fields:
+    return names
+  selected = list(dict.fromkeys(field.strip() for field in fields.split(',') if field.strip()))
+  unknown = [field for field in selected if field not in names]
+  if unknown:
+    abort(400, 'unknown fields {}, available are {}'.format(', '.join(unknown), ', '.join(names)))
+  return selected
+
+def page_size():
+  limit = request.args.get('limit', current_app.config['API_PAGE_SIZE'], type=int)
+  return max(1, min(limit, current_app.config['API_MAX_PAGE_SIZE']))
+
+def genres_of(association, key, ids):
+  """
+    Returns {id: [genre names]} of venues or artists, with one query
+  """
+  genres = {entity_id: [] for entity_id in ids}
+  if ids:
+    rows = db.session.query(getattr(association.c, key), Genre.name).join(
+      Genre, Genre.id == association.c.genre_id
+    ).filter(getattr(association.c, key).in_(ids)).order_by(Genre.name)
+    for entity_id, name in rows:
+      genres[entity_id].append(name)
+  return genres
+
+#----------------------------------------------------------------------------#
+# Venues and artists.
+#----------------------------------------------------------------------------#
+
+def entity_rows(model, available, association, key, criterion, limit=None):
+  """
+    Returns the venues or artists matching criterion, in id order, as dicts of
+    the selected fields, and their ids
+  """
+  fields = selected_fields(available, extra=('genres',))
+  columns = [field for field in fields if field != 'genres']
+  query = db.session.query(model.id, *(available[field] for field in columns)).filter(criterion).order_by(model.id)
+  rows = query.limit(limit).all() if limit else query.all()
+  data = [dict(zip(columns, row[1:])) for row in rows]
+  if 'genres' in fields:
+    genres = genres_of(association, key, [row[0] for row in rows])
+    for item, row in zip(data, rows):
+      item['genres'] = genres[row[0]]
+  return data, [row[0] for row in rows]
+
+def entity_list(model, available, association, key):
+  limit = page_size()
+  data, ids = entity_rows(model, available, association, key,
+                          model.id > request.args.get('after', 0, type=int), limit + 1)
+  next_cursor = None
+  if len(data) > limit:
+    data = data[:limit]
+    next_cursor = ids[limit - 1]
+  return api_response({'success': True, 'data': data, 'next': next_cursor})
+
+def entity_detail(model, available, association, key, entity_id):
+  data, _ = entity_rows(model, available, association, key, model.id == entity_id)
+  if not data:
+    abort(404, '{} {} does not exist'.format(model.__tablename__.lower(), entity_id))
+  return api_response({'success': True, 'data': data[0]})
+
+@bp.route('/venues')
+def venues():
+  return entity_list(Venue, VENUE_FIELDS, venue_genres, 'venue_id')
+
+@bp.route('/venues/<int:venue_id>')
+def venue(venue_id):
+  return entity_detail(Venue, VENUE_FIELDS, venue_genres, 'venue_id', venue_id)
+
+@bp.route('/artists')
+def artists():
+  return entity_list(Artist, ARTIST_FIELDS, artist_genres, 'artist_id')
+
+@bp.route('/artists/<int:artist_id>')
+def artist(artist_id):
+  return entity_detail(Artist, ARTIST_FIELDS, artist_genres, 'artist_id', artist_id)
+
+#----------------------------------------------------------------------------#
+# Shows.
+#----------------------------------------------------------------------------#
+
+SHOW_CURSOR_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+def decode_show_cursor(cursor):
+  """
+    Decodes a (start_time, id) cursor of the show list, aborts with 400 if it is malformed
+  """
+  try:
+    start_time, show_id = cursor.split('_')
+    return datetime.strptime(start_time, SHOW_CURSOR_FORMAT), int(show_id)
+  except ValueError:
+    abort(400, 'malformed cursor')
+
+def integer_arg(key):
+  """
+    Returns the integer query parameter key or None if it is absent, aborts with 400 if it is not an integer
+  """
+  value = request.args.get(key)
+  if value is None:
+    return None
+  try:
+    return int(value)
+  except ValueError:
+    abort(400, '{} must be an integer'.format(key))
+
+@bp.route('/shows')
+def shows():
+  """
+    Lists shows in time order, paged on (start_time, id); ?venue_id= / ?artist_id=
+    list the shows of a venue or artist through the Show indexes and ?upcoming=1
+    or ?upcoming=0 restricts the list to the shows after or before now
+  """
+  fields = selected_fields(SHOW_FIELDS)
+  query = db.session.query(Show.start_time, Show.id, *(SHOW_FIELDS[field] for field in fields))
+  # the names of the venue and artist are only joined in when they are selected
+  if 'venue_name' in fields:
+    query = query.join(Venue, Venue.id == Show.venue_id)
+  if {'artist_name', 'artist_image_link'} & set(fields):
+    query = query.join(Artist, Artist.id == Show.artist_id)
+  for key, column in (('venue_id', Show.venue_id), ('artist_id', Show.artist_id)):
+    if key in request.args:
+      query = query.filter(column == integer_arg(key))
+  upcoming = integer_arg('upcoming')
+  if upcoming is not None:
+    now = datetime.today()
+    query = query.filter(Show.start_time > now if upcoming else Show.start_time <= now)
+  if request.args.get('after'):
+    query = query.filter(db.tuple_(Show.start_time, Show.id) > decode_show_cursor(request.args['after']))
+
+  limit = page_size()
+  rows = query.order_by(Show.start_time, Show.id).limit(limit + 1).all()
+  next_cursor = None
+  if len(rows) > limit:
+    rows = rows[:limit]
+    next_cursor = '{}_{}'.format(rows[-1][0].strftime(SHOW_CURSOR_FORMAT), rows[-1][1])
+  return api_response({'success': True, 'data': [dict(zip(fields, row[2:])) for row in rows],
+                       'next': next_cursor})
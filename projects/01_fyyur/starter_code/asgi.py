@@ -0,0 +1,35 @@
+#----------------------------------------------------------------------------#
+# ASGI entry point.
+#
+# Serves the Flask app from an ASGI server such as uvicorn or hypercorn:
+#
+#   $ uvicorn asgi:application --workers 4
+#
+# The adapter (a2wsgi) runs each request on a pool of ASGI_THREADS threads,
+# so a slow request only holds its own thread while the event loop keeps
+# accepting connections. SQLAlchemy 1.3 has no asyncio driver, so views stay
+# synchronous; pages run their independent queries side by side with
+# CONCURRENT_QUERIES (see concurrent_queries in views.py).
+#----------------------------------------------------------------------------#
+
+def create_asgi_app(wsgi_app=None, threads=None):
+  """
+    Returns the Flask app (by default a new one from create_app()) wrapped as ASGI application
+  """
+  from a2wsgi import WSGIMiddleware
+  if wsgi_app is None:
+    from app import create_app
+    wsgi_app = create_app()
+  if threads is None:
+    threads = wsgi_app.config.get('ASGI_THREADS', 16)
+  return WSGIMiddleware(wsgi_app, workers=threads)
+
+
+def __getattr__(name):
+  # "asgi:application" is built when the server asks for it, so importing
+  # create_asgi_app (benchmarks, tests) does not create an app as a side effect
+  if name == 'application':
+    global application
+    application = create_asgi_app()
+    return application
+  raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,194 @@
+#----------------------------------------------------------------------------#
+# Static assets: content-hashed URLs and bundles.
+#
+# Templates link static files through asset_url(), which appends a hash of the
+# file's content (?v=), and the stylesheets and scripts of the layout through
+# bundle_urls(). `flask build-assets` concatenates and minifies each bundle
+# into one file named after its content hash, next to its sources so relative
+# url()s keep working, and records it in static/assets.json. Responses for
+# hashed URLs never change, so they are sent with a far-future Cache-Control
+# (ASSETS_MAX_AGE) and browsers only ask again after a deploy changed them.
+#
+# Minification uses rcssmin / rjsmin when installed; without them CSS gets a
+# conservative comment and whitespace strip and JS is only concatenated (most
+# of it is shipped minified already).
+#----------------------------------------------------------------------------#
+
+import glob
+import hashlib
+import json
+import os
+import re
+import time
+
+from flask import request, url_for
+
+BUNDLES = {
+  'css/site.css': [
+    'css/bootstrap.min.css',
+    'css/layout.main.css',
+    'css/main.css',
+    'css/main.responsive.css',
+    'css/main.quickfix.css',
+  ],
+  # loaded synchronously in <head>
+  'js/head.js': [
+    'js/libs/modernizr-2.8.2.min.js',
+    'js/libs/moment.min.js',
+  ],
+  # loaded with defer, after jQuery
+  'js/site.js': [
+    'js/script.js',
+    'js/libs/bootstrap-3.1.1.min.js',
+    'js/plugins.js',
+  ],
+}
+
+MANIFEST = 'assets.json'
+
+_CSS_COMMENT = re.compile(r'/\*.*?\*/', re.S)
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,>])\s*')
+_SOURCE_MAP = re.compile(r'^[ \t]*//[#@] sourceMappingURL=.*$', re.M)
+
+
+def content_hash(data):
+  return hashlib.sha256(data).hexdigest()[:12]
+
+
+def minify_css(text):
+  try:
+    import rcssmin
+  except ImportError:
+    # no space is removed around ':' since 'a :hover' and 'a:hover' differ
+    text = _CSS_COMMENT.sub('', text)
+    text = _CSS_SPACE.sub(' ', text)
+    return _CSS_PUNCTUATION.sub(r'\1', text).replace(';}', '}').strip()
+  return rcssmin.cssmin(text)
+
+
+def minify_js(text):
+  # the source maps of the libraries do not apply to the bundle
+  text = _SOURCE_MAP.sub('', text)
+  try:
+    import rjsmin
+  except ImportError:
+    return text.strip()
+  return rjsmin.jsmin(text)
+
+
+class StaticAssets(object):
+  """
+    Content-hashed static URLs (asset_url, bundle_urls template globals) and their
+    cache headers. Configured by ASSETS_BUNDLES (serve the built bundles) and
+    ASSETS_MAX_AGE.
+  """
+
+  def __init__(self, app=None, bundles=None):
+    self.bundles = bundles if bundles is not None else BUNDLES
+    self.static_folder = None
+    self.use_bundles = False
+    self.watch = False
+    self.max_age = 365 * 24 * 3600
+    self.manifest = {}
+    self._hashes = {}
+    if app is not None:
+      self.init_app(app)
+
+  def init_app(self, app):
+    self.static_folder = app.static_folder
+    self.use_bundles = app.config.get('ASSETS_BUNDLES', True)
+    # in debug mode files are hashed again whenever they change
+    self.watch = app.debug
+    self.max_age = app.config.get('ASSETS_MAX_AGE', self.max_age)
+    self.manifest = self.read_manifest()
+    app.add_template_global(self.asset_url)
+    app.add_template_global(self.bundle_urls)
+    app.after_request(self.add_cache_headers)
+
+  def read_manifest(self):
+    try:
+      with open(os.path.join(self.static_folder, MANIFEST)) as f:
+        return json.load(f)
+    except (OSError, ValueError):
+      return {}
+
+  def file_hash(self, filename):
+    """
+      Returns the content hash of a file below the static folder, None if it does not exist
+    """
+    path = os.path.join(self.static_folder, filename)
+    cached = self._hashes.get(filename)
+    if cached is not None and not self.watch:
+      return cached[1]
+    try:
+      mtime = os.stat(path).st_mtime_ns
+    except OSError:
+      return None
+    if cached is None or cached[0] != mtime:
+      with open(path, 'rb') as f:
+        cached = (mtime, content_hash(f.read()))
+      self._hashes[filename] = cached
+    return cached[1]
+
+  def asset_url(self, filename):
+    """
+      Returns the URL of a static file with the hash of its content
+    """
+    return url_for('static', filename=filename, v=self.file_hash(filename))
+
+  def bundle_urls(self, name):
+    """
+      Returns the URLs to load a bundle from: the built bundle, or its sources with
+      ASSETS_BUNDLES off and before `flask build-assets` ran
+    """
+    if self.use_bundles and name in self.manifest:
+      return [url_for('static', filename=self.manifest[name])]
+    return [self.asset_url(filename) for filename in self.bundles[name]]
+
+  def add_cache_headers(self, response):
+    if request.endpoint != 'static' or response.status_code not in (200, 304):
+      return response
+    filename = request.view_args.get('filename')
+    hashed = request.args.get('v') == self.file_hash(filename) or filename in self.manifest.values()
+    if hashed:
+      response.cache_control.no_cache = None
+      response.cache_control.public = True
+      response.cache_control.max_age = self.max_age
+      response.cache_control.immutable = True
+      response.expires = int(time.time() + self.max_age)
+    return response
+
+  def build(self):
+    """
+      Writes every bundle as one minified file named after its content hash, removes the
+      previous builds and updates the manifest. Returns {name: (file, source bytes, bytes)}.
+    """
+    built = {}
+    for name, sources in self.bundles.items():
+      root, extension = os.path.splitext(name)
+      minify = minify_css if extension == '.css' else minify_js
+      texts, size = [], 0
+      for source in sources:
+        with open(os.path.join(self.static_folder, source), encoding='utf-8') as f:
+          text = f.read()
+        size += len(text.encode('utf-8'))
+        texts.append(minify(text))
+      # a missing semicolon at the end of one script must not join it with the next
+      data = (';\n' if extension == '.js' else '\n').join(texts).encode('utf-8')
+      filename = '{}.{}{}'.format(root, content_hash(data), extension)
+
+      for old in glob.glob(os.path.join(self.static_folder, root + '.*' + extension)):
+        if re.fullmatch(r'[0-9a-f]{12}', os.path.basename(old)[len(os.path.basename(root)) + 1:-len(extension)]):
+          os.remove(old)
+      with open(os.path.join(self.static_folder, filename), 'wb') as f:
+        f.write(data)
+      built[name] = (filename, size, len(data))
+
+    manifest = {name: filename for name, (filename, _, _) in built.items()}
+    path = os.path.join(self.static_folder, MANIFEST)
+    with open(path + '.tmp', 'w') as f:
+      json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + '.tmp', path)
+    self.manifest = manifest
+    return built
@@ -0,0 +1,67 @@
+"""
+Transfer size and latency of the JSON API against the HTML pages.
+
+Seeds the database and fetches the artist list and a venue's upcoming shows
+as HTML page, as full JSON and as sparse JSON (?fields=), each plain and
+compressed, and prints the bytes on the wire and the mean latency of each.
+
+  $ python benchmarks/bench_api.py --artists 500
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from seed import seed
+
+
+def fetch(client, path, encoding, repeat):
+  headers = {'Accept-Encoding': encoding} if encoding else {}
+  started = time.perf_counter()
+  for _ in range(repeat):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200, (path, response.status_code)
+  return len(response.data), (time.perf_counter() - started) / repeat * 1000, response.content_encoding
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=500)
+  parser.add_argument('--artists', type=int, default=500)
+  parser.add_argument('--shows', type=int, default=50000)
+  parser.add_argument('--repeat', type=int, default=20)
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  os.environ['CACHE_TYPE'] = 'null'
+  from app import create_app
+  from models import db
+  app = create_app()
+
+  with app.app_context():
+    seed(venues=args.venues, artists=args.artists, shows=args.shows)
+    db.session.remove()
+
+  venue = args.venues // 2
+  limit = app.config['API_MAX_PAGE_SIZE']
+  cases = [
+    ('artists html', '/artists'),
+    ('artists json', '/api/v1/artists?limit={}'.format(limit)),
+    ('artists id,name', '/api/v1/artists?fields=id,name&limit={}'.format(limit)),
+    ('venue html', '/venues/{}'.format(venue)),
+    ('venue shows json', '/api/v1/shows?venue_id={}&upcoming=1&limit={}'.format(venue, limit)),
+    ('venue shows sparse', '/api/v1/shows?venue_id={}&upcoming=1&fields=start_time,artist_name&limit={}'.format(
+      venue, limit)),
+  ]
+  client = app.test_client()
+  print('{:<20} {:<9} {:>10} {:>9}'.format('request', 'encoding', 'bytes', 'ms'))
+  for name, path in cases:
+    for encoding in (None, 'gzip', 'br'):
+      size, latency, used = fetch(client, path, encoding, args.repeat)
+      print('{:<20} {:<9} {:>10} {:>9.2f}'.format(name, used or '-', size, latency))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,108 @@
+"""
+Load test of the threaded WSGI server against the ASGI mode.
+
+Seeds the database (SQLite by default, pass a scratch PostgreSQL database
+with --database to see the effect of concurrent queries), then serves the
+app once with werkzeug's threaded WSGI server and once with uvicorn through
+asgi.py, each with CONCURRENT_QUERIES off and on, and fetches venue and
+artist pages from --concurrency client threads. Prints throughput and
+p50/p95/p99 latency per setup.
+
+  $ python benchmarks/bench_asgi.py --database postgresql://localhost/fyyur_bench
+"""
+
+import argparse
+import os
+import socket
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from bench_suite import summarize
+from seed import seed
+
+
+def serve_wsgi(app):
+  from werkzeug.serving import make_server
+  server = make_server('127.0.0.1', 0, app, threaded=True)
+  thread = threading.Thread(target=server.serve_forever)
+  thread.daemon = True
+  thread.start()
+  return server.server_port, server.shutdown
+
+
+def serve_asgi(app):
+  import uvicorn
+  from asgi import create_asgi_app
+  sock = socket.socket()
+  sock.bind(('127.0.0.1', 0))
+  server = uvicorn.Server(uvicorn.Config(create_asgi_app(app), log_level='warning'))
+  thread = threading.Thread(target=server.run, kwargs={'sockets': [sock]})
+  thread.daemon = True
+  thread.start()
+  while not server.started:
+    time.sleep(0.01)
+
+  def stop():
+    server.should_exit = True
+    thread.join()
+  return sock.getsockname()[1], stop
+
+
+def load(port, paths, concurrency):
+  def fetch(path):
+    started = time.perf_counter()
+    with urllib.request.urlopen('http://127.0.0.1:{}{}'.format(port, path)) as response:
+      response.read()
+    return time.perf_counter() - started
+
+  started = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    samples = list(pool.map(fetch, paths))
+  return len(paths) / (time.perf_counter() - started), summarize(samples)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=500)
+  parser.add_argument('--artists', type=int, default=500)
+  parser.add_argument('--shows', type=int, default=50000)
+  parser.add_argument('--requests', type=int, default=1000)
+  parser.add_argument('--concurrency', type=int, default=16)
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  os.environ['CACHE_TYPE'] = 'null'
+  from app import create_app
+  from models import db
+  app = create_app()
+
+  with app.app_context():
+    seed(venues=args.venues, artists=args.artists, shows=args.shows)
+    db.session.remove()
+
+  paths = []
+  for i in range(args.requests):
+    if i % 2:
+      paths.append('/venues/{}'.format(2 + i % (args.venues - 1)))
+    else:
+      paths.append('/artists/{}'.format(2 + i % (args.artists - 1)))
+
+  print('{:<6} {:<10} {:>10} {:>9} {:>9} {:>9}'.format('server', 'queries', 'requests/s', 'p50 ms', 'p95 ms', 'p99 ms'))
+  for name, serve in (('wsgi', serve_wsgi), ('asgi', serve_asgi)):
+    for concurrent in (False, True):
+      app.config['CONCURRENT_QUERIES'] = concurrent
+      port, stop = serve(app)
+      try:
+        rate, latency = load(port, paths, args.concurrency)
+      finally:
+        stop()
+      print('{:<6} {:<10} {:>10.1f} {:>9.2f} {:>9.2f} {:>9.2f}'.format(
+        name, 'concurrent' if concurrent else 'serial', rate, latency['p50_ms'], latency['p95_ms'], latency['p99_ms']))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,86 @@
+"""
+Benchmark of GET /shows throughput with debug logging.
+
+Seeds a SQLite (or the given) database and fetches the first /shows page
+from --concurrency threads, once per logging setup:
+- off:   LOG_LEVEL INFO, the debug payload is never built
+- sync:  DEBUG records formatted and written to --sink in the request thread
+- queue: DEBUG records put on the LogPipeline queue, written by its listener
+Reports requests per second and, for the queue, records dropped because it
+was full.
+
+  $ python benchmarks/bench_logging.py --requests 2000 --concurrency 8
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from seed import seed
+
+
+def run(app, requests, concurrency):
+  def fetch(count):
+    client = app.test_client()
+    for _ in range(count):
+      response = client.get('/shows')
+      assert response.status_code == 200, response.status_code
+
+  share = [requests // concurrency] * concurrency
+  started = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    list(pool.map(fetch, share))
+  return sum(share) / (time.perf_counter() - started)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=200)
+  parser.add_argument('--artists', type=int, default=200)
+  parser.add_argument('--shows', type=int, default=5000)
+  parser.add_argument('--requests', type=int, default=2000)
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--sink', default=os.path.join(tempfile.gettempdir(), 'fyyur_bench.log'),
+                      help='file the log records are written to')
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  os.environ['CACHE_TYPE'] = 'null'
+  from app import create_app
+  from models import db
+  from extensions import log_pipeline
+  from logs import JsonFormatter
+  app = create_app()
+
+  with app.app_context():
+    seed(venues=args.venues, artists=args.artists, shows=args.shows)
+    db.session.remove()
+
+  def sink():
+    handler = logging.FileHandler(args.sink)
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+  for mode in ('off', 'sync', 'queue'):
+    if os.path.exists(args.sink):
+      os.remove(args.sink)
+    if mode == 'sync':
+      log_pipeline.stop()
+      app.logger.handlers = [sink()]
+      app.logger.setLevel(logging.DEBUG)
+    else:
+      log_pipeline.install(app.logger, [sink()], logging.DEBUG if mode == 'queue' else logging.INFO)
+
+    rate = run(app, args.requests, args.concurrency)
+    log_pipeline.stop()
+    size = os.path.getsize(args.sink) if os.path.exists(args.sink) else 0
+    dropped = ', {} records dropped'.format(log_pipeline.dropped) if mode == 'queue' else ''
+    print('{:<6} {:8.1f} requests/s, {:.1f} MB logged{}'.format(mode, rate, size / 1e6, dropped))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,58 @@
+"""
+Benchmark of the venue name search.
+
+Compares the latency of the former name ILIKE '%term%' query with the search
+backend (trigram index on PostgreSQL, in-process index otherwise) for a few
+terms, after seeding the given number of venues.
+
+  $ python benchmarks/bench_search.py --venues 100000
+  $ python benchmarks/bench_search.py --database postgresql://localhost/fyyur_bench
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from seed import seed
+
+TERMS = ['Venue 1', 'nue 4242', '99', 'no such venue']
+
+
+def timed(function, repeat):
+  started = time.perf_counter()
+  for _ in range(repeat):
+    result = function()
+  return (time.perf_counter() - started) / repeat * 1000, len(result)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=100000)
+  parser.add_argument('--repeat', type=int, default=20)
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  from app import create_app
+  from models import Venue
+  from views import venue_search
+  app = create_app()
+  from search import like_pattern
+
+  with app.app_context():
+    seed(venues=args.venues, artists=10, shows=0)
+    limit = app.config['SEARCH_RESULTS_LIMIT']
+    venue_search.search('', limit)  # loads the in-process index once
+
+    print('{} backend, {} venues'.format(type(venue_search.backend).__name__, args.venues))
+    for term in TERMS:
+      ilike_ms, ilike_hits = timed(lambda: Venue.query.filter(
+        Venue.name.ilike(like_pattern(term), escape='\\')).all(), args.repeat)
+      index_ms, index_hits = timed(lambda: venue_search.search(term, limit), args.repeat)
+      print('{:>15}: ilike {:8.2f} ms ({:>6} rows)  index {:8.2f} ms ({:>3} rows)'.format(
+        repr(term), ilike_ms, ilike_hits, index_ms, index_hits))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,97 @@
+"""
+Startup time benchmark.
+
+Runs fresh interpreters (python -X importtime) that
+1. import app (the module only, blueprints and heavy libraries are deferred),
+2. call create_app(), and
+3. serve the first request (GET /),
+and reports the median over --runs of each step plus the slowest imports.
+With --record the figures are appended, with the git revision, to
+benchmarks/startup_history.jsonl so startup time can be tracked over time.
+
+  $ python benchmarks/bench_startup.py --record
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+HISTORY = os.path.join(ROOT, 'benchmarks', 'startup_history.jsonl')
+
+PROBE = '''
+import time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+application = app.create_app()
+created = time.perf_counter()
+application.test_client().get('/')
+served = time.perf_counter()
+print('{} {} {}'.format(imported - started, created - imported, served - created))
+'''
+
+
+def parse_importtime(stderr):
+  """
+    Returns {module: cumulative microseconds} from the -X importtime output
+  """
+  modules = {}
+  for line in stderr.splitlines():
+    if not line.startswith('import time:') or 'cumulative' in line:
+      continue
+    _, cumulative, name = line[len('import time:'):].split('|')
+    modules[name.strip()] = max(modules.get(name.strip(), 0), int(cumulative))
+  return modules
+
+
+def probe(database):
+  env = dict(os.environ, DATABASE_URL=database, CACHE_TYPE='null')
+  result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE], cwd=ROOT, env=env,
+                          capture_output=True, text=True, check=True)
+  imported, created, served = (float(value) for value in result.stdout.split()[-3:])
+  return imported, created, served, parse_importtime(result.stderr)
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_startup.db'))
+  parser.add_argument('--runs', type=int, default=5)
+  parser.add_argument('--top', type=int, default=10, help='number of slowest imports listed')
+  parser.add_argument('--record', action='store_true', help='append the result to ' + HISTORY)
+  args = parser.parse_args()
+
+  probe(args.database)  # compiles the bytecode
+  runs = [probe(args.database) for _ in range(args.runs)]
+  steps = {
+    'import_ms': statistics.median(run[0] for run in runs) * 1000,
+    'create_app_ms': statistics.median(run[1] for run in runs) * 1000,
+    'first_request_ms': statistics.median(run[2] for run in runs) * 1000,
+  }
+  steps['total_ms'] = sum(steps.values())
+  for name, value in steps.items():
+    print('{:<17} {:8.1f} ms'.format(name, value))
+
+  modules = runs[-1][3]
+  print('\nslowest imports (cumulative, last run)')
+  for name, micros in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+    print('  {:<40} {:8.1f} ms'.format(name, micros / 1000))
+
+  if args.record:
+    revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip()
+    entry = dict({name: round(value, 1) for name, value in steps.items()},
+                 revision=revision, date=datetime.now().isoformat(timespec='seconds'),
+                 python=sys.version.split()[0], runs=args.runs)
+    with open(HISTORY, 'a') as f:
+      f.write(json.dumps(entry, sort_keys=True) + '\n')
+    print('\nrecorded in {}'.format(HISTORY))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,200 @@
+"""
+Benchmark suite over every Fyyur read route.
+
+Seeds the database (SQLite by default) with synthetic venues, artists and
+power-law distributed shows, then
+1. drives each route sequentially through the Flask test client, recording
+   latency and statements per request (X-Query-Count header), and
+2. serves the app on a local port and replays the routes from --concurrency
+   HTTP client threads, recording latency and throughput.
+Prints p50/p95/p99 latency per route and the peak RSS of the process. The
+page cache is disabled so every request does the real work.
+
+With --baseline the results are compared to a stored run; a route whose
+p95 grew by more than --tolerance, or which issues more statements, counts
+as a regression and makes the script exit with status 1. --save writes the
+current run as the new baseline.
+
+  $ python benchmarks/bench_suite.py --save
+  $ python benchmarks/bench_suite.py --baseline benchmarks/baseline.json
+"""
+
+import argparse
+import json
+import os
+import resource
+import tempfile
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from seed import seed
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def routes(venues, artists):
+  """
+    Returns (name, method, path, form data) of the benchmarked requests.
+    Entity 1 has the most shows, the middle one a typical number.
+  """
+  return [
+    ('home', 'GET', '/', None),
+    ('venues', 'GET', '/venues', None),
+    ('artists', 'GET', '/artists', None),
+    ('shows', 'GET', '/shows', None),
+    ('venue_top', 'GET', '/venues/1', None),
+    ('venue_mid', 'GET', '/venues/{}'.format(max(venues // 2, 1)), None),
+    ('artist_top', 'GET', '/artists/1', None),
+    ('artist_mid', 'GET', '/artists/{}'.format(max(artists // 2, 1)), None),
+    ('search_venues', 'POST', '/venues/search', {'search_term': 'nue 1'}),
+    ('search_artists', 'POST', '/artists/search', {'search_term': 'ist 1'}),
+    ('genre_venues', 'GET', '/genres/Jazz/venues?state=CA', None),
+    ('create_show_form', 'GET', '/shows/create', None),
+  ]
+
+
+def percentile(samples, p):
+  ordered = sorted(samples)
+  return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))]
+
+
+def summarize(samples):
+  return {
+    'p50_ms': round(percentile(samples, 50) * 1000, 3),
+    'p95_ms': round(percentile(samples, 95) * 1000, 3),
+    'p99_ms': round(percentile(samples, 99) * 1000, 3),
+  }
+
+
+def run_client(app, requests, repeat):
+  client = app.test_client()
+  results = {}
+  for name, method, path, data in requests:
+    samples, queries = [], []
+    for _ in range(repeat):
+      started = time.perf_counter()
+      response = client.open(path, method=method, data=data)
+      samples.append(time.perf_counter() - started)
+      assert response.status_code == 200, (path, response.status_code)
+      queries.append(int(response.headers.get('X-Query-Count', 0)))
+    results[name] = dict(summarize(samples), queries=max(queries))
+  return results
+
+
+def run_http(app, requests, repeat, concurrency):
+  from werkzeug.serving import make_server
+  server = make_server('127.0.0.1', 0, app, threaded=True)
+  thread = threading.Thread(target=server.serve_forever)
+  thread.daemon = True
+  thread.start()
+  base = 'http://127.0.0.1:{}'.format(server.server_port)
+
+  def fetch(request):
+    name, method, path, data = request
+    body = urllib.parse.urlencode(data).encode() if data else None
+    started = time.perf_counter()
+    with urllib.request.urlopen(urllib.request.Request(base + path, data=body, method=method)) as response:
+      response.read()
+    return name, time.perf_counter() - started
+
+  work = [request for request in requests for _ in range(repeat)]
+  samples = {}
+  started = time.perf_counter()
+  with ThreadPoolExecutor(max_workers=concurrency) as pool:
+    for name, elapsed in pool.map(fetch, work):
+      samples.setdefault(name, []).append(elapsed)
+  elapsed = time.perf_counter() - started
+  server.shutdown()
+
+  results = {name: summarize(values) for name, values in samples.items()}
+  return results, len(work) / elapsed
+
+
+def compare(current, baseline, tolerance):
+  """
+    Returns a list of regression messages of current against baseline
+  """
+  regressions = []
+  for name, result in current['client'].items():
+    before = baseline.get('client', {}).get(name)
+    if before is None:
+      continue
+    if result['queries'] > before['queries']:
+      regressions.append('{}: {} statements per request, baseline {}'.format(
+        name, result['queries'], before['queries']))
+    if result['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+      regressions.append('{}: p95 {:.2f} ms, baseline {:.2f} ms'.format(
+        name, result['p95_ms'], before['p95_ms']))
+  return regressions
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=2000)
+  parser.add_argument('--artists', type=int, default=2000)
+  parser.add_argument('--shows', type=int, default=200000)
+  parser.add_argument('--alpha', type=float, default=1.0, help='power law exponent of shows per venue/artist')
+  parser.add_argument('--repeat', type=int, default=30, help='requests per route and phase')
+  parser.add_argument('--concurrency', type=int, default=8)
+  parser.add_argument('--baseline', help='compare against this stored run')
+  parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative p95 growth')
+  parser.add_argument('--save', nargs='?', const=BASELINE, help='store this run as baseline')
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  os.environ['CACHE_TYPE'] = 'null'
+  from app import create_app
+  from models import db
+  app = create_app()
+
+  with app.app_context():
+    seed(venues=args.venues, artists=args.artists, shows=args.shows, alpha=args.alpha)
+    db.session.remove()
+  requests = routes(args.venues, args.artists)
+
+  client = run_client(app, requests, args.repeat)
+  http, throughput = run_http(app, requests, args.repeat, args.concurrency)
+
+  print('{:<18} {:>9} {:>9} {:>9} {:>8} | {:>9} {:>9} {:>9}'.format(
+    'route', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'http p50', 'http p95', 'http p99'))
+  for name, _, _, _ in requests:
+    c, h = client[name], http[name]
+    print('{:<18} {:>9.2f} {:>9.2f} {:>9.2f} {:>8} | {:>9.2f} {:>9.2f} {:>9.2f}'.format(
+      name, c['p50_ms'], c['p95_ms'], c['p99_ms'], c['queries'], h['p50_ms'], h['p95_ms'], h['p99_ms']))
+  peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+  print('http throughput {:.1f} requests/s at concurrency {}, peak RSS {:.1f} MB'.format(
+    throughput, args.concurrency, peak_rss_mb))
+
+  current = {
+    'volumes': {'venues': args.venues, 'artists': args.artists, 'shows': args.shows, 'alpha': args.alpha},
+    'client': client,
+    'http': http,
+    'http_requests_per_second': round(throughput, 1),
+    'peak_rss_mb': round(peak_rss_mb, 1),
+  }
+
+  if args.save:
+    with open(args.save, 'w') as f:
+      json.dump(current, f, indent=2, sort_keys=True)
+      f.write('\n')
+    print('baseline written to {}'.format(args.save))
+
+  if args.baseline:
+    with open(args.baseline) as f:
+      baseline = json.load(f)
+    if baseline.get('volumes') != current['volumes']:
+      print('warning: baseline was recorded with {}'.format(baseline.get('volumes')))
+    regressions = compare(current, baseline, args.tolerance)
+    for regression in regressions:
+      print('REGRESSION ' + regression)
+    if regressions:
+      raise SystemExit(1)
+    print('no regressions against {}'.format(args.baseline))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,55 @@
+"""
+Benchmark of the /venues area listing.
+
+Seeds a SQLite (or the given) database and reports the number of SQL
+statements and the wall time of one GET /venues, for growing data volumes.
+The statement count must not grow with the number of venues or shows.
+
+  $ python benchmarks/bench_venues.py --venues 10000 --shows 1000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from seed import seed
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__)
+  parser.add_argument('--database', default='sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_bench.db'))
+  parser.add_argument('--venues', type=int, default=10000)
+  parser.add_argument('--artists', type=int, default=1000)
+  parser.add_argument('--shows', type=int, default=1000000)
+  args = parser.parse_args()
+
+  os.environ['DATABASE_URL'] = args.database
+  os.environ['CACHE_TYPE'] = 'null'
+  from app import create_app
+  from models import db
+  app = create_app()
+  from sqlalchemy import event
+
+  with app.app_context():
+    statements = []
+    event.listen(db.engine, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *rest: statements.append(statement))
+
+    for venues, shows in [(args.venues // 100, args.shows // 100),
+                          (args.venues // 10, args.shows // 10),
+                          (args.venues, args.shows)]:
+      seed(venues=venues, artists=args.artists, shows=shows)
+      db.session.remove()
+      client = app.test_client()
+      del statements[:]
+      started = time.perf_counter()
+      response = client.get('/venues')
+      elapsed = time.perf_counter() - started
+      assert response.status_code == 200
+      print('{:>8} venues {:>9} shows: {:>3} queries {:8.1f} ms'.format(
+        venues, shows, len(statements), elapsed * 1000))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,90 @@
+"""
+Seeds a Fyyur database with synthetic venues, artists and shows.
+
+Used by the benchmark scripts in this folder, rows are written with
+batched executemany inserts so millions of shows load in seconds.
+"""
+
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BATCH_SIZE = 10000
+GENRES = ['Jazz', 'Rock n Roll', 'Folk', 'Blues', 'Classical', 'Hip-Hop']
+CITIES = [('San Francisco', 'CA'), ('New York', 'NY'), ('Austin', 'TX'),
+          ('Chicago', 'IL'), ('Seattle', 'WA'), ('Nashville', 'TN'),
+          ('Los Angeles', 'CA'), ('Portland', 'OR')]
+
+
+def _insert(table, rows):
+  from models import db
+  if not rows:
+    return
+  for start in range(0, len(rows), BATCH_SIZE):
+    db.session.execute(table.insert(), rows[start:start + BATCH_SIZE])
+  db.session.commit()
+
+
+def _power_law(count, alpha):
+  """
+    Cumulative weights giving entity k (1-based) a share proportional to 1 / k ** alpha
+  """
+  weights, total = [], 0.0
+  for k in range(1, count + 1):
+    total += 1.0 / k ** alpha
+    weights.append(total)
+  return weights
+
+
+def seed(venues=1000, artists=1000, shows=10000, seed=0, alpha=0.0):
+  """
+    Drops and recreates all tables, then inserts the requested volumes.
+    Half of the shows lie in the past, half in the future. Shows are spread
+    over venues and artists by a power law with exponent alpha, venue and
+    artist 1 getting the most; alpha 0 spreads them uniformly.
+  """
+  from models import db, Venue, Artist, Show, Genre, venue_genres, artist_genres
+  from views import refresh_upcoming_show_counts
+  rnd = random.Random(seed)
+
+  db.drop_all()
+  db.create_all()
+
+  _insert(Venue.__table__, [{
+    'id': i,
+    'name': 'Venue {}'.format(i),
+    'city': CITIES[i % len(CITIES)][0],
+    'state': CITIES[i % len(CITIES)][1]
+  } for i in range(1, venues + 1)])
+
+  _insert(Artist.__table__, [{
+    'id': i,
+    'name': 'Artist {}'.format(i),
+    'city': CITIES[i % len(CITIES)][0],
+    'state': CITIES[i % len(CITIES)][1]
+  } for i in range(1, artists + 1)])
+
+  _insert(Genre.__table__, [{'id': i, 'name': name} for i, name in enumerate(GENRES, 1)])
+  _insert(venue_genres, [{'venue_id': i, 'genre_id': g}
+                         for i in range(1, venues + 1)
+                         for g in set([i % len(GENRES) + 1, i % 3 + 1])])
+  _insert(artist_genres, [{'artist_id': i, 'genre_id': i % len(GENRES) + 1}
+                          for i in range(1, artists + 1)])
+
+  # one minute apart around "now" keeps (start_time, artist_id, venue_id) unique
+  first = datetime.today() - timedelta(minutes=shows // 2)
+  venue_weights = _power_law(venues, alpha)
+  artist_weights = _power_law(artists, alpha)
+  for start in range(0, shows, BATCH_SIZE):
+    size = min(BATCH_SIZE, shows - start)
+    venue_ids = rnd.choices(range(1, venues + 1), cum_weights=venue_weights, k=size)
+    artist_ids = rnd.choices(range(1, artists + 1), cum_weights=artist_weights, k=size)
+    _insert(Show.__table__, [{
+      'start_time': first + timedelta(minutes=start + i),
+      'venue_id': venue_ids[i],
+      'artist_id': artist_ids[i]
+    } for i in range(size)])
+  refresh_upcoming_show_counts()
@@ -0,0 +1,117 @@
+#----------------------------------------------------------------------------#
+# Streaming bulk import and export helpers used by "flask import-data" and
+# "flask export-data".
+#
+# Files are CSV (with a header line) or JSON lines, chosen by the extension
+# (.csv, .jsonl / .json). Rows are read and written one at a time and
+# inserted in fixed-size batches: with PostgreSQL COPY, otherwise with one
+# executemany INSERT per batch.
+#----------------------------------------------------------------------------#
+
+import csv
+import io
+import json
+import time
+from datetime import datetime
+
+
+def is_csv(path):
+  return path.lower().endswith('.csv')
+
+
+def read_rows(path):
+  """
+    Yields the rows of a CSV or JSON lines file as dicts, empty CSV cells become None
+  """
+  with open(path, newline='' if is_csv(path) else None, encoding='utf-8') as f:
+    if is_csv(path):
+      for row in csv.DictReader(f):
+        yield {key: (value if value != '' else None) for key, value in row.items()}
+    else:
+      for line in f:
+        if line.strip():
+          yield json.loads(line)
+
+
+def _jsonable(value):
+  return value.isoformat() if isinstance(value, datetime) else value
+
+
+def write_rows(path, columns, rows):
+  """
+    Writes an iterable of row tuples in the order of columns to a CSV or JSON lines file,
+    returns the number of rows written
+  """
+  count = 0
+  with open(path, 'w', newline='' if is_csv(path) else None, encoding='utf-8') as f:
+    if is_csv(path):
+      writer = csv.writer(f)
+      writer.writerow(columns)
+      for row in rows:
+        writer.writerow([_jsonable(value) for value in row])
+        count += 1
+    else:
+      for row in rows:
+        f.write(json.dumps(dict(zip(columns, (_jsonable(value) for value in row)))))
+        f.write('\n')
+        count += 1
+  return count
+
+
+def batched(rows, size):
+  """
+    Groups an iterable into lists of at most size items
+  """
+  batch = []
+  for row in rows:
+    batch.append(row)
+    if len(batch) == size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+
+def insert_batch(db, table, rows):
+  """
+    Inserts a list of dicts into table in the current transaction,
+    with COPY on PostgreSQL and an executemany INSERT elsewhere
+  """
+  if not rows:
+    return
+  if db.engine.dialect.name == 'postgresql':
+    columns = [column.name for column in table.columns if column.name in rows[0]]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+      writer.writerow(['\\N' if row.get(column) is None else _jsonable(row.get(column)) for column in columns])
+    buffer.seek(0)
+    cursor = db.session.connection().connection.cursor()
+    cursor.copy_expert('COPY "{}" ({}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'.format(
+      table.name, ', '.join('"{}"'.format(column) for column in columns)), buffer)
+  else:
+    db.session.execute(table.insert(), rows)
+
+
+class Throughput(object):
+  """
+    Counts processed rows and reports rows per second through report(message)
+  """
+
+  def __init__(self, report):
+    self.report = report
+    self.rows = 0
+    self.errors = 0
+    self.started = time.perf_counter()
+
+  def add(self, rows, errors=0):
+    self.rows += rows
+    self.errors += errors
+    self.report('{} rows ({} skipped), {:.0f} rows/s'.format(self.rows, self.errors, self.rate()))
+
+  def rate(self):
+    return self.rows / max(time.perf_counter() - self.started, 1e-9)
+
+  def done(self):
+    self.report('done: {} rows in {:.1f} s ({:.0f} rows/s), {} skipped'.format(
+      self.rows, time.perf_counter() - self.started, self.rate(), self.errors))
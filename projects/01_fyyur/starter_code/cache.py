@@ -0,0 +1,228 @@
+#----------------------------------------------------------------------------#
+# Rendered page cache.
+#
+# Read pages are cached as rendered HTML under a key per page and entity
+# (e.g. 'venues', 'venue:3', 'shows:<cursor>') and dropped by the write
+# handlers that change them. Pages cached with etag=True also get a version
+# stamp, the hash of their content, stored next to them under 'etag:<key>':
+# a request whose If-None-Match carries it is answered with 304 before the
+# view runs, and a write drops the stamp together with the page. Backends:
+# - 'lru':   in-process LRU with a TTL per entry (default)
+# - 'redis': any client with the redis-py get/set/delete/scan_iter methods,
+#            shared by all workers
+# - 'null':  caches nothing
+#----------------------------------------------------------------------------#
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, jsonify, request, session
+
+ETAG_PREFIX = 'etag:'
+
+
+class NullCache(object):
+
+  def get(self, key):
+    return None
+
+  def set(self, key, value, ttl):
+    pass
+
+  def delete(self, key):
+    pass
+
+  def delete_prefix(self, prefix):
+    pass
+
+  def clear(self):
+    pass
+
+  def __len__(self):
+    return 0
+
+
+class LRUCache(object):
+  """
+    Thread safe in-process cache holding at most max_entries values,
+    evicting the least recently used one and expiring entries after their ttl
+  """
+
+  def __init__(self, max_entries=1024):
+    self.max_entries = max_entries
+    self._entries = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, key):
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None:
+        return None
+      expires, value = entry
+      if expires < time.monotonic():
+        del self._entries[key]
+        return None
+      self._entries.move_to_end(key)
+      return value
+
+  def set(self, key, value, ttl):
+    with self._lock:
+      self._entries[key] = (time.monotonic() + ttl, value)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        self._entries.popitem(last=False)
+
+  def delete(self, key):
+    with self._lock:
+      self._entries.pop(key, None)
+
+  def delete_prefix(self, prefix):
+    with self._lock:
+      for key in [key for key in self._entries if key.startswith(prefix)]:
+        del self._entries[key]
+
+  def clear(self):
+    with self._lock:
+      self._entries.clear()
+
+  def __len__(self):
+    return len(self._entries)
+
+
+class RedisCache(object):
+  """
+    Cache in a Redis server (or a stand-in with the same client methods),
+    all keys are stored below namespace
+  """
+
+  def __init__(self, client, namespace='fyyur:page:'):
+    self.client = client
+    self.namespace = namespace
+
+  def get(self, key):
+    value = self.client.get(self.namespace + key)
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+  def set(self, key, value, ttl):
+    self.client.set(self.namespace + key, value.encode('utf-8'), ex=int(ttl))
+
+  def delete(self, key):
+    self.client.delete(self.namespace + key)
+
+  def delete_prefix(self, prefix):
+    keys = list(self.client.scan_iter(match=self.namespace + prefix + '*'))
+    if keys:
+      self.client.delete(*keys)
+
+  def clear(self):
+    self.delete_prefix('')
+
+  def __len__(self):
+    return sum(1 for _ in self.client.scan_iter(match=self.namespace + '*'))
+
+
+class PageCache(object):
+  """
+    Caches rendered pages of views and counts hits and misses.
+    Configured by CACHE_TYPE, CACHE_DEFAULT_TTL, CACHE_MAX_ENTRIES and CACHE_REDIS_URL.
+  """
+
+  def __init__(self, app=None, backend=None):
+    self.backend = backend if backend is not None else NullCache()
+    self.default_ttl = 60
+    self.hits = 0
+    self.misses = 0
+    self._lock = threading.Lock()
+    if app is not None:
+      self.init_app(app, backend)
+
+  def init_app(self, app, backend=None):
+    cache_type = app.config.get('CACHE_TYPE', 'lru')
+    self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+    if backend is not None:
+      self.backend = backend
+    elif cache_type == 'lru':
+      self.backend = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 1024))
+    elif cache_type == 'redis':
+      import redis
+      self.backend = RedisCache(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+    else:
+      self.backend = NullCache()
+    app.add_url_rule('/cache/stats', 'cache_stats', lambda: jsonify(self.stats()))
+
+  def _count(self, hit):
+    with self._lock:
+      if hit:
+        self.hits += 1
+      else:
+        self.misses += 1
+
+  def stats(self):
+    return {
+      'backend': type(self.backend).__name__,
+      'hits': self.hits,
+      'misses': self.misses,
+      'entries': len(self.backend)
+    }
+
+  def cached(self, key, unless=None, ttl=None, etag=False):
+    """
+      Decorates a view to cache its rendered page:
+      - key: called with the view arguments, returns the cache key of the page
+      - unless: called with the view arguments, True skips the cache for this request
+      - etag: send the version stamp of the page as ETag, revalidated on every view
+        (Cache-Control: no-cache), and answer a matching If-None-Match with 304
+      Pages are neither served from nor stored in the cache while flash messages are pending,
+      and only string responses (rendered templates) are stored.
+    """
+    def decorator(view):
+      @wraps(view)
+      def wrapper(*args, **kwargs):
+        if '_flashes' in session or (unless is not None and unless(*args, **kwargs)):
+          return view(*args, **kwargs)
+        cache_key = key(*args, **kwargs)
+        version = self.backend.get(ETAG_PREFIX + cache_key) if etag else None
+        if version is not None and request.if_none_match.contains_weak(version):
+          self._count(True)
+          return self._conditional(None, version)
+        page = self.backend.get(cache_key)
+        self._count(page is not None)
+        stored = page is not None
+        if page is None:
+          page = view(*args, **kwargs)
+          stored = isinstance(page, str) and '_flashes' not in session
+          if stored:
+            self.backend.set(cache_key, page, ttl or self.default_ttl)
+          version = None
+        if not etag or not isinstance(page, str):
+          return page
+        # the stamp of a page is the hash of its content, so every worker
+        # (and every later rendering of unchanged data) sends the same ETag
+        if version is None:
+          version = hashlib.sha1(page.encode('utf-8')).hexdigest()[:20]
+          if stored:
+            self.backend.set(ETAG_PREFIX + cache_key, version, ttl or self.default_ttl)
+        return self._conditional(page, version)
+      return wrapper
+    return decorator
+
+  def _conditional(self, page, version):
+    if page is None or request.if_none_match.contains_weak(version):
+      response = current_app.response_class(status=304)
+    else:
+      response = current_app.make_response(page)
+    response.set_etag(version, weak=True)
+    response.cache_control.no_cache = True
+    return response
+
+  def invalidate(self, *keys):
+    for key in keys:
+      self.backend.delete(key)
+      self.backend.delete(ETAG_PREFIX + key)
+
+  def invalidate_prefix(self, prefix):
+    self.backend.delete_prefix(prefix)
+    self.backend.delete_prefix(ETAG_PREFIX + prefix)
@@ -0,0 +1,42 @@
+#----------------------------------------------------------------------------#
+# Cached select options of the show form.
+#
+# The (id, name) pairs of all venues or artists are read with one query of
+# those two columns and kept in the process until a write handler calls
+# invalidate() or the ttl runs out, which bounds how long other worker
+# processes show a stale list. Catalogs with more rows than the form embeds
+# are not cached; the form falls back to autocomplete for them.
+#----------------------------------------------------------------------------#
+
+import threading
+import time
+
+
+class ChoiceList(object):
+  """
+    (id, name) choices of a model for a select box, ordered by name
+  """
+
+  def __init__(self, db, model):
+    self.db = db
+    self.model = model
+    self._lock = threading.Lock()
+    self._choices = None
+    self._expires = 0.0
+
+  def choices(self, limit, ttl=300):
+    """
+      Returns the list of (id, name) pairs, or None if there are more than limit rows
+    """
+    with self._lock:
+      if self._expires < time.monotonic():
+        model = self.model
+        rows = self.db.session.query(model.id, model.name).order_by(model.name, model.id).limit(limit + 1).all()
+        self._choices = [tuple(row) for row in rows] if len(rows) <= limit else None
+        self._expires = time.monotonic() + ttl
+      return self._choices
+
+  def invalidate(self):
+    with self._lock:
+      self._expires = 0.0
+      self._choices = None
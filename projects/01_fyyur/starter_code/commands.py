@@ -0,0 +1,243 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from datetime import datetime, timedelta
+import click
+from flask import Blueprint
+from models import db, Show, Genre, Venue, Artist, venue_genres, artist_genres
+from extensions import page_cache, static_assets
+from cache import LRUCache
+from views import venue_search, artist_search, venue_choices, artist_choices, refresh_upcoming_show_counts, count_new_shows, parse_any_datetime
+from bulk import read_rows, write_rows, batched, insert_batch, Throughput
+
+#----------------------------------------------------------------------------#
+# Commands.
+#----------------------------------------------------------------------------#
+
+# commands are registered at the top level: "flask import-data", not "flask commands import-data"
+bp = Blueprint('commands', __name__, cli_group=None)
+
+@bp.cli.command('age-show-counts')
+@click.option('--minutes', default=60, help='Recount venues and artists with shows started in the last MINUTES.')
+@click.option('--all', 'recount_all', is_flag=True, help='Recount every venue and artist.')
+def age_show_counts(minutes, recount_all):
+  """Moves shows that have started out of the upcoming show counters, run it every MINUTES (e.g. from cron)."""
+  since = None if recount_all else datetime.today() - timedelta(minutes=minutes)
+  click.echo('{} venues and artists recounted'.format(refresh_upcoming_show_counts(since)))
+  page_cache.invalidate('venues')
+
+#  Bulk import / export
+#  ----------------------------------------------------------------
+
+def entity_columns(model):
+  return [column.name for column in model.__table__.columns if column.name != 'upcoming_shows_count']
+
+def parse_bool(value):
+  if isinstance(value, str):
+    return value.strip().lower() in ('1', 'y', 'yes', 'true', 't')
+  return bool(value)
+
+def parse_datetime(value):
+  if isinstance(value, datetime):
+    return value
+  try:
+    return datetime.fromisoformat(value)
+  except ValueError:
+    return parse_any_datetime(value)
+
+def existing_ids(model, ids, chunk_size=500):
+  """
+    Returns the ids of ids that model has rows for already
+  """
+  ids = list(ids)
+  existing = set()
+  for start in range(0, len(ids), chunk_size):
+    existing.update(entity_id for (entity_id,) in db.session.query(model.id).filter(
+      model.id.in_(ids[start:start + chunk_size])))
+  return existing
+
+def import_entities(model, association, key, path, batch_size, progress):
+  """
+    Streams venues or artists from path into model and their genres into association,
+    rows without id get ids following the current maximum; rows whose id exists
+    already (in the database or earlier in the file) are counted as errors
+  """
+  columns = entity_columns(model)
+  required = [column.name for column in model.__table__.columns
+              if not column.nullable and column.name not in ('id', 'upcoming_shows_count')]
+  genre_ids = dict(db.session.query(Genre.name, Genre.id).all())
+  next_id = (db.session.query(db.func.max(model.id)).scalar() or 0) + 1
+
+  for batch in batched(read_rows(path), batch_size):
+    entities, errors = {}, 0
+    for row in batch:
+      if any(not row.get(column) for column in required):
+        errors += 1
+        continue
+      entity = {column: row.get(column) for column in columns}
+      if entity['id'] is None:
+        entity['id'] = next_id
+      try:
+        entity['id'] = int(entity['id'])
+      except (TypeError, ValueError):
+        errors += 1
+        continue
+      if entity['id'] in entities:
+        errors += 1
+        continue
+      next_id = max(next_id, entity['id'] + 1)
+      for column in ('seeking_talent', 'seeking_venue'):
+        if column in entity:
+          entity[column] = parse_bool(entity[column])
+      genres = row.get('genres') or []
+      if isinstance(genres, str):
+        genres = genres.split(',')
+      entities[entity['id']] = (entity, genres)
+
+    # earlier batches are committed, so this also finds ids repeated across batches
+    duplicates = existing_ids(model, entities)
+    errors += len(duplicates)
+    rows, links = [], []
+    for entity_id, (entity, genres) in entities.items():
+      if entity_id in duplicates:
+        continue
+      for name in dict.fromkeys(name.strip() for name in genres if name and name.strip()):
+        if name not in genre_ids:
+          genre = Genre(name=name)
+          db.session.add(genre)
+          db.session.flush()
+          genre_ids[name] = genre.id
+        links.append({'genre_id': genre_ids[name], key: entity_id})
+      rows.append(entity)
+    insert_batch(db, model.__table__, rows)
+    insert_batch(db, association, links)
+    db.session.commit()
+    progress.add(len(rows), errors)
+
+  if db.engine.dialect.name == 'postgresql':
+    db.session.execute(db.text("SELECT setval(pg_get_serial_sequence('\"{}\"', 'id'), :last)".format(
+      model.__tablename__)), {'last': max(next_id - 1, 1)})
+    db.session.commit()
+
+def existing_shows(keys, chunk_size=500):
+  """
+    Returns the (start_time, artist_id, venue_id) of keys that are already shows
+  """
+  starts = list({start_time for start_time, _, _ in keys})
+  existing = set()
+  for start in range(0, len(starts), chunk_size):
+    existing.update(tuple(row) for row in db.session.query(Show.start_time, Show.artist_id, Show.venue_id).filter(
+      Show.start_time.in_(starts[start:start + chunk_size])))
+  return existing & set(keys)
+
+def import_shows(path, batch_size, progress):
+  """
+    Streams shows from path, venue and artist are given by venue_id / artist_id
+    or resolved from venue_name / artist_name; rows with an unknown venue or artist
+    and shows that exist already (in the database or earlier in the file) are
+    counted as errors
+  """
+  venue_ids = dict(db.session.query(Venue.name, Venue.id).all())
+  artist_ids = dict(db.session.query(Artist.name, Artist.id).all())
+  known_venues, known_artists = set(venue_ids.values()), set(artist_ids.values())
+
+  for batch in batched(read_rows(path), batch_size):
+    shows, errors = {}, 0
+    for row in batch:
+      try:
+        key = (
+          parse_datetime(row['start_time']),
+          int(row.get('artist_id') or artist_ids[row.get('artist_name')]),
+          int(row.get('venue_id') or venue_ids[row.get('venue_name')])
+        )
+      except (KeyError, TypeError, ValueError, OverflowError):
+        errors += 1
+        continue
+      if key[1] not in known_artists or key[2] not in known_venues or key in shows:
+        errors += 1
+        continue
+      shows[key] = True
+    # earlier batches are committed, so this also finds duplicates across batches
+    duplicates = existing_shows(list(shows))
+    errors += len(duplicates)
+    rows = [{'start_time': start_time, 'artist_id': artist_id, 'venue_id': venue_id}
+            for start_time, artist_id, venue_id in shows if (start_time, artist_id, venue_id) not in duplicates]
+    insert_batch(db, Show.__table__, rows)
+    count_new_shows(rows)
+    db.session.commit()
+    progress.add(len(rows), errors)
+
+def export_entities(model, association, key, batch_size):
+  """
+    Yields the rows of model ordered by id with their genre names comma joined as last column
+  """
+  columns = entity_columns(model)
+  query = db.session.query(*[model.__table__.c[column] for column in columns]
+    ).order_by(model.id).execution_options(stream_results=True)
+  for batch in batched(query.yield_per(batch_size), batch_size):
+    genres = {}
+    for entity_id, name in db.session.query(key, Genre.name).join(
+        Genre, Genre.id == association.c.genre_id).filter(key.in_([row[0] for row in batch])):
+      genres.setdefault(entity_id, []).append(name)
+    for row in batch:
+      yield tuple(row) + (','.join(sorted(genres.get(row[0], []))),)
+
+@bp.cli.command('import-data')
+@click.argument('table', type=click.Choice(['venues', 'artists', 'shows']))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=5000, help='Rows per INSERT / COPY and commit.')
+def import_data(table, path, batch_size):
+  """Loads venues, artists or shows from a CSV or JSON lines file.
+
+  The page cache is cleared where this command can reach it: a shared
+  'redis' cache is, the in-process 'lru' caches of running servers are
+  not, their pages refresh after CACHE_DEFAULT_TTL seconds.
+  """
+  progress = Throughput(click.echo)
+  if table == 'venues':
+    import_entities(Venue, venue_genres, 'venue_id', path, batch_size, progress)
+    venue_search.invalidate()
+    venue_choices.invalidate()
+  elif table == 'artists':
+    import_entities(Artist, artist_genres, 'artist_id', path, batch_size, progress)
+    artist_search.invalidate()
+    artist_choices.invalidate()
+  else:
+    import_shows(path, batch_size, progress)
+  page_cache.backend.clear()
+  progress.done()
+  if isinstance(page_cache.backend, LRUCache):
+    click.echo('note: running servers keep their cached pages (CACHE_TYPE lru) for up to {} s'.format(
+      page_cache.default_ttl))
+
+@bp.cli.command('export-data')
+@click.argument('table', type=click.Choice(['venues', 'artists', 'shows']))
+@click.argument('path', type=click.Path(dir_okay=False, writable=True))
+@click.option('--batch-size', default=5000, help='Rows fetched per round trip.')
+def export_data(table, path, batch_size):
+  """Writes venues, artists or shows to a CSV or JSON lines file."""
+  progress = Throughput(click.echo)
+  if table == 'venues':
+    columns = entity_columns(Venue) + ['genres']
+    rows = export_entities(Venue, venue_genres, venue_genres.c.venue_id, batch_size)
+  elif table == 'artists':
+    columns = entity_columns(Artist) + ['genres']
+    rows = export_entities(Artist, artist_genres, artist_genres.c.artist_id, batch_size)
+  else:
+    columns = ['start_time', 'artist_id', 'venue_id']
+    rows = db.session.query(Show.start_time, Show.artist_id, Show.venue_id).order_by(
+      Show.start_time, Show.artist_id, Show.venue_id).execution_options(stream_results=True).yield_per(batch_size)
+  progress.add(write_rows(path, columns, rows))
+  progress.done()
+
+
+#  Static assets
+#  ----------------------------------------------------------------
+
+@bp.cli.command('build-assets')
+def build_assets():
+  """Bundles and minifies the layout's CSS and JS into content-hashed files, run on deploy before (re)starting the app."""
+  for name, (filename, source_size, size) in sorted(static_assets.build().items()):
+    click.echo('{:<12} -> {:<28} {:>8} bytes ({} in the sources)'.format(name, filename, size, source_size))
+  page_cache.backend.clear()
@@ -0,0 +1,18 @@
+#----------------------------------------------------------------------------#
+# Extensions.
+#
+# Created without an app so that views and commands can import them (e.g.
+# for the page_cache.cached decorator); create_app() binds them to the app.
+#----------------------------------------------------------------------------#
+
+from assets import StaticAssets
+from cache import PageCache
+from logs import LogPipeline
+from metrics import DatabaseMetrics
+from profiling import RequestProfiler
+
+log_pipeline = LogPipeline()
+database_metrics = DatabaseMetrics()
+page_cache = PageCache()
+profiler = RequestProfiler()
+static_assets = StaticAssets()
@@ -0,0 +1,31 @@
+#----------------------------------------------------------------------------#
+# gunicorn settings.
+#
+#   $ gunicorn -c gunicorn.conf.py "app:create_app()"
+#
+# The master creates and warms up the app once (preload_app, when_ready),
+# then forks the workers, which share its imported modules, compiled
+# templates and locale data copy-on-write instead of each loading them.
+#----------------------------------------------------------------------------#
+
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '127.0.0.1:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+preload_app = True
+
+
+def when_ready(server):
+  # runs in the master after the app was loaded and before the workers are forked
+  from app import warm_up
+  warm_up(server.app.wsgi())
+
+
+def post_fork(server, worker):
+  # pooled connections must not be shared between processes, in case the
+  # master opened any while loading the app
+  from models import db
+  with server.app.wsgi().app_context():
+    db.engine.dispose()
@@ -0,0 +1,123 @@
+#----------------------------------------------------------------------------#
+# Logging pipeline.
+#
+# Request threads only put records on a bounded in-memory queue
+# (QueueHandler); a QueueListener thread formats them and writes them to
+# stderr and, outside debug mode, to LOG_FILE. When the queue is full the
+# record is dropped and counted instead of blocking the request.
+# LOG_FORMAT 'json' writes one JSON object per line with the fields passed
+# as extra=..., 'text' the classic one-line format.
+#----------------------------------------------------------------------------#
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
+
+# attributes every LogRecord has, everything else came in through extra=...
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JsonFormatter(logging.Formatter):
+  """
+    Formats a record as one JSON object including its extra fields
+  """
+
+  def format(self, record):
+    entry = {
+      'time': datetime.fromtimestamp(record.created).isoformat(),
+      'level': record.levelname,
+      'logger': record.name,
+      'message': record.getMessage(),
+      'source': '{}:{}'.format(record.pathname, record.lineno),
+    }
+    for name, value in vars(record).items():
+      if name not in RECORD_ATTRIBUTES and not name.startswith('_'):
+        entry[name] = value
+    if record.exc_info:
+      entry['exception'] = self.formatException(record.exc_info)
+    return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+  """
+    QueueHandler that never blocks: records that do not fit into the queue are counted and dropped
+  """
+
+  def __init__(self, log_queue):
+    super(DroppingQueueHandler, self).__init__(log_queue)
+    self.dropped = 0
+    self._lock = threading.Lock()
+
+  def enqueue(self, record):
+    try:
+      self.queue.put_nowait(record)
+    except queue.Full:
+      with self._lock:
+        self.dropped += 1
+
+
+class LogPipeline(object):
+  """
+    Routes the app logger (and its children) through a queue to a listener thread.
+    Configured by LOG_LEVEL, LOG_FORMAT, LOG_FILE and LOG_QUEUE_SIZE.
+  """
+
+  def __init__(self, app=None):
+    self.handler = None
+    self.listener = None
+    self._installed = None
+    atexit.register(self.stop)
+    # the listener thread does not survive a fork (e.g. gunicorn --preload),
+    # forked workers start their own
+    os.register_at_fork(after_in_child=self._after_fork)
+    if app is not None:
+      self.init_app(app)
+
+  def init_app(self, app):
+    formatter = JsonFormatter() if app.config.get('LOG_FORMAT', 'json') == 'json' else logging.Formatter(TEXT_FORMAT)
+    targets = [logging.StreamHandler()]
+    if not app.debug and app.config.get('LOG_FILE'):
+      targets.append(logging.FileHandler(app.config['LOG_FILE']))
+    for target in targets:
+      target.setFormatter(formatter)
+    self.install(app.logger, targets, app.config.get('LOG_LEVEL', 'INFO'), app.config.get('LOG_QUEUE_SIZE', 10000))
+
+  def install(self, logger, targets, level, queue_size=10000):
+    """
+      Replaces the handlers of logger by a queue drained into targets by a new listener thread
+    """
+    self.stop()
+    self._installed = (logger, targets, level, queue_size)
+    self.handler = DroppingQueueHandler(queue.Queue(queue_size))
+    self.listener = QueueListener(self.handler.queue, *targets, respect_handler_level=True)
+    logger.handlers = [self.handler]
+    logger.setLevel(level)
+    logger.propagate = False
+    self.start()
+
+  @property
+  def dropped(self):
+    return self.handler.dropped if self.handler is not None else 0
+
+  def start(self):
+    if self.listener is not None and self.listener._thread is None:
+      self.listener.start()
+
+  def stop(self):
+    """
+      Writes out the queued records and stops the listener thread
+    """
+    if self.listener is not None and self.listener._thread is not None:
+      self.listener.stop()
+
+  def _after_fork(self):
+    if self.listener is not None and self.listener._thread is not None:
+      self.listener = None
+      self.install(*self._installed)
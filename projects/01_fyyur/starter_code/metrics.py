@@ -0,0 +1,205 @@
+#----------------------------------------------------------------------------#
+# Database metrics.
+#
+# Hooks into SQLAlchemy pool and cursor events and Flask request hooks to
+# count connection checkouts, their wait time, connections in use and the
+# number and duration of SQL statements per request. The figures are served
+# in the Prometheus text format at /metrics.
+#----------------------------------------------------------------------------#
+
+import threading
+import time
+from contextvars import ContextVar
+from types import SimpleNamespace
+
+from flask import Response
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+def listen_once(target, identifier, fn):
+  """
+    Adds an event listener unless it is there already, so an extension initialized
+    again for the same engine does not count twice
+  """
+  if not event.contains(target, identifier, fn):
+    event.listen(target, identifier, fn)
+
+
+class ContextLocal(object):
+  """
+    Attributes local to the current context, like threading.local, but carried
+    into worker threads that run contextvars.copy_context() of a request (see
+    concurrent_queries), so their statements count for that request.
+    reset() starts a new set of attributes for the current context.
+  """
+
+  def __init__(self):
+    object.__setattr__(self, '_var', ContextVar('context_local_{}'.format(id(self))))
+
+  def reset(self):
+    self._var.set(SimpleNamespace())
+
+  def __getattr__(self, name):
+    namespace = self._var.get(None)
+    if namespace is None:
+      raise AttributeError(name)
+    return getattr(namespace, name)
+
+  def __setattr__(self, name, value):
+    namespace = self._var.get(None)
+    if namespace is None:
+      self.reset()
+      namespace = self._var.get()
+    setattr(namespace, name, value)
+
+
+class InstrumentedQueuePool(QueuePool):
+  """
+    QueuePool that reports how long each checkout waited for a connection
+    to the DatabaseMetrics set as its metrics attribute
+  """
+
+  metrics = None
+
+  def recreate(self):
+    # engine.dispose() replaces the pool, the new one reports to the same metrics
+    pool = super(InstrumentedQueuePool, self).recreate()
+    pool.metrics = self.metrics
+    return pool
+
+  def _do_get(self):
+    started = time.perf_counter()
+    try:
+      return super(InstrumentedQueuePool, self)._do_get()
+    finally:
+      if self.metrics is not None:
+        self.metrics.checkout_waited(time.perf_counter() - started)
+
+
+class DatabaseMetrics(object):
+  """
+    Collects pool and per-request query metrics of the app's database.
+    On servers other than SQLite the engine gets an InstrumentedQueuePool
+    unless SQLALCHEMY_ENGINE_OPTIONS names another pool class.
+  """
+
+  def __init__(self, app=None, db=None):
+    self._lock = threading.Lock()
+    self._request = ContextLocal()
+    self.values = {
+      'checkouts': 0,
+      'checkins': 0,
+      'connects': 0,
+      'checkout_wait_seconds': 0.0,
+      'checkout_wait_max_seconds': 0.0,
+      'checkout_waits': 0,
+      'requests': 0,
+      'queries': 0,
+      'query_seconds': 0.0,
+      'queries_max_per_request': 0,
+    }
+    self.db = db
+    if app is not None:
+      self.init_app(app, db)
+
+  def init_app(self, app, db):
+    self.db = db
+    if not app.config['SQLALCHEMY_DATABASE_URI'].startswith('sqlite'):
+      # a copy, the default dict of config.py is shared by all apps
+      options = dict(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+      options.setdefault('poolclass', InstrumentedQueuePool)
+      app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+    # listeners of this app's engine (and its pool) only, every app has its own
+    engine = db.get_engine(app)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+      engine.pool.metrics = self
+    listen_once(engine, 'connect', self._on_connect)
+    listen_once(engine, 'checkout', self._on_checkout)
+    listen_once(engine, 'checkin', self._on_checkin)
+    listen_once(engine, 'before_cursor_execute', self._before_cursor_execute)
+    listen_once(engine, 'after_cursor_execute', self._after_cursor_execute)
+    listen_once(engine, 'handle_error', self._handle_error)
+
+    app.before_request(self._before_request)
+    app.after_request(self._after_request)
+    app.add_url_rule('/metrics', 'metrics', self.render)
+
+  def _add(self, **values):
+    with self._lock:
+      for name, value in values.items():
+        self.values[name] += value
+
+  def checkout_waited(self, seconds):
+    with self._lock:
+      self.values['checkout_waits'] += 1
+      self.values['checkout_wait_seconds'] += seconds
+      self.values['checkout_wait_max_seconds'] = max(self.values['checkout_wait_max_seconds'], seconds)
+
+  def _on_connect(self, dbapi_connection, connection_record):
+    self._add(connects=1)
+
+  def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+    self._add(checkouts=1)
+
+  def _on_checkin(self, dbapi_connection, connection_record):
+    self._add(checkins=1)
+
+  def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+  def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_started'].pop()
+    self._add(queries=1, query_seconds=elapsed)
+    if getattr(self._request, 'active', False):
+      # concurrent_queries() workers add to the counters of their request
+      with self._lock:
+        self._request.queries += 1
+        self._request.seconds += elapsed
+
+  def _handle_error(self, context):
+    # a failed statement gets no after_cursor_execute, its start must not stay on the connection
+    if context.connection is not None and context.connection.info.get('query_started'):
+      context.connection.info['query_started'].pop()
+
+  def _before_request(self):
+    self._request.reset()
+    self._request.active = True
+    self._request.queries = 0
+    self._request.seconds = 0.0
+
+  def _after_request(self, response):
+    if getattr(self._request, 'active', False):
+      self._request.active = False
+      with self._lock:
+        self.values['requests'] += 1
+        self.values['queries_max_per_request'] = max(self.values['queries_max_per_request'],
+                                                     self._request.queries)
+      response.headers['X-Query-Count'] = str(self._request.queries)
+      response.headers['X-Query-Time'] = '{:.6f}'.format(self._request.seconds)
+    return response
+
+  def pool_status(self):
+    """
+      Returns size, checked out connections and overflow of the engine's pool, where the pool tells
+    """
+    pool = self.db.engine.pool
+    status = {}
+    for name in ('size', 'checkedout', 'overflow'):
+      if hasattr(pool, name):
+        status[name] = getattr(pool, name)()
+    return status
+
+  def snapshot(self):
+    with self._lock:
+      values = dict(self.values)
+    values['connections_in_use'] = values['checkouts'] - values['checkins']
+    values.update(('pool_' + name, value) for name, value in self.pool_status().items())
+    return values
+
+  def render(self):
+    lines = []
+    for name, value in sorted(self.snapshot().items()):
+      lines.append('fyyur_db_{} {}'.format(name, value))
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
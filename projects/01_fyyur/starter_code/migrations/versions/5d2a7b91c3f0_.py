@@ -0,0 +1,98 @@
+"""normalized genres for venues and artists
+
+Revision ID: 5d2a7b91c3f0
+Revises: 3c1f8e2d9a47
+Create Date: 2026-10-18 11:02:17.604518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2a7b91c3f0'
+down_revision = '3c1f8e2d9a47'
+branch_labels = None
+depends_on = None
+
+
+def split_genres(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def bulk_insert(table, rows):
+    if rows:
+        op.bulk_insert(table, rows)
+
+
+def upgrade():
+    genre = op.create_table('Genre',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=120), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    venue_genre = op.create_table('VenueGenre',
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.Column('venue_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ),
+    sa.ForeignKeyConstraint(['venue_id'], ['Venue.id'], ),
+    sa.PrimaryKeyConstraint('genre_id', 'venue_id')
+    )
+    op.create_index(op.f('ix_VenueGenre_venue_id'), 'VenueGenre', ['venue_id'], unique=False)
+    artist_genre = op.create_table('ArtistGenre',
+    sa.Column('genre_id', sa.Integer(), nullable=False),
+    sa.Column('artist_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['artist_id'], ['Artist.id'], ),
+    sa.ForeignKeyConstraint(['genre_id'], ['Genre.id'], ),
+    sa.PrimaryKeyConstraint('genre_id', 'artist_id')
+    )
+    op.create_index(op.f('ix_ArtistGenre_artist_id'), 'ArtistGenre', ['artist_id'], unique=False)
+    op.create_index(op.f('ix_Venue_state'), 'Venue', ['state'], unique=False)
+    op.create_index(op.f('ix_Artist_state'), 'Artist', ['state'], unique=False)
+
+    # backfill from the comma separated genres columns
+    bind = op.get_bind()
+    venues = bind.execute(sa.text('SELECT id, genres FROM "Venue"')).fetchall()
+    artists = bind.execute(sa.text('SELECT id, genres FROM "Artist"')).fetchall()
+
+    names = sorted(set(name for _, genres in venues + artists for name in split_genres(genres)))
+    bulk_insert(genre, [{'id': i, 'name': name} for i, name in enumerate(names, 1)])
+    genre_ids = {name: i for i, name in enumerate(names, 1)}
+    if names and bind.dialect.name == 'postgresql':
+        bind.execute(sa.text('SELECT setval(\'"Genre_id_seq"\', :last)'), last=len(names))
+
+    bulk_insert(venue_genre, [{'genre_id': gid, 'venue_id': venue_id}
+                              for venue_id, genres in venues
+                              for gid in set(genre_ids[name] for name in split_genres(genres))])
+    bulk_insert(artist_genre, [{'genre_id': gid, 'artist_id': artist_id}
+                               for artist_id, genres in artists
+                               for gid in set(genre_ids[name] for name in split_genres(genres))])
+
+    op.drop_column('Venue', 'genres')
+    op.drop_column('Artist', 'genres')
+
+
+def downgrade():
+    op.add_column('Artist', sa.Column('genres', sa.String(length=120), nullable=True))
+    op.add_column('Venue', sa.Column('genres', sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    for table, key in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        rows = bind.execute(sa.text(
+            'SELECT a.{key}, g.name FROM "{table}Genre" a JOIN "Genre" g ON g.id = a.genre_id '
+            'ORDER BY a.{key}, g.name'.format(key=key, table=table))).fetchall()
+        genres = {}
+        for entity_id, name in rows:
+            genres.setdefault(entity_id, []).append(name)
+        for entity_id, names in genres.items():
+            bind.execute(sa.text('UPDATE "{}" SET genres = :genres WHERE id = :id'.format(table)),
+                         genres=','.join(names), id=entity_id)
+
+    op.drop_index(op.f('ix_Artist_state'), table_name='Artist')
+    op.drop_index(op.f('ix_Venue_state'), table_name='Venue')
+    op.drop_index(op.f('ix_ArtistGenre_artist_id'), table_name='ArtistGenre')
+    op.drop_table('ArtistGenre')
+    op.drop_index(op.f('ix_VenueGenre_venue_id'), table_name='VenueGenre')
+    op.drop_table('VenueGenre')
+    op.drop_table('Genre')
@@ -0,0 +1,36 @@
+"""upcoming show counters on venues and artists
+
+Revision ID: 7e4b0c6d2f18
+Revises: 5d2a7b91c3f0
+Create Date: 2026-10-18 12:20:53.119027
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e4b0c6d2f18'
+down_revision = '5d2a7b91c3f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('Venue', sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('Artist', sa.Column('upcoming_shows_count', sa.Integer(), server_default='0', nullable=False))
+
+    # backfill, later kept up to date by the app and "flask age-show-counts"
+    bind = op.get_bind()
+    for table, key in (('Venue', 'venue_id'), ('Artist', 'artist_id')):
+        bind.execute(sa.text(
+            'UPDATE "{table}" SET upcoming_shows_count = ('
+            'SELECT count(*) FROM "Show" WHERE "Show".{key} = "{table}".id AND "Show".start_time > :now)'
+            .format(table=table, key=key)), now=datetime.today())
+
+
+def downgrade():
+    op.drop_column('Artist', 'upcoming_shows_count')
+    op.drop_column('Venue', 'upcoming_shows_count')
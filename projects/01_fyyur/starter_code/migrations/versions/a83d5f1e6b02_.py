@@ -0,0 +1,35 @@
+"""surrogate id and venue/artist time indexes on Show
+
+Revision ID: a83d5f1e6b02
+Revises: 7e4b0c6d2f18
+Create Date: 2026-10-18 13:41:05.772390
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a83d5f1e6b02'
+down_revision = '7e4b0c6d2f18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # the old composite key stays unique, the shows of a venue or artist
+    # are found through (venue_id, start_time) and (artist_id, start_time)
+    op.drop_constraint('Show_pkey', 'Show', type_='primary')
+    op.execute('ALTER TABLE "Show" ADD COLUMN id SERIAL')
+    op.create_primary_key('Show_pkey', 'Show', ['id'])
+    op.create_unique_constraint('uq_Show_start_time_artist_id_venue_id', 'Show', ['start_time', 'artist_id', 'venue_id'])
+    op.create_index('ix_Show_venue_id_start_time', 'Show', ['venue_id', 'start_time'], unique=False)
+    op.create_index('ix_Show_artist_id_start_time', 'Show', ['artist_id', 'start_time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_Show_artist_id_start_time', table_name='Show')
+    op.drop_index('ix_Show_venue_id_start_time', table_name='Show')
+    op.drop_constraint('uq_Show_start_time_artist_id_venue_id', 'Show', type_='unique')
+    op.drop_constraint('Show_pkey', 'Show', type_='primary')
+    op.drop_column('Show', 'id')
+    op.create_primary_key('Show_pkey', 'Show', ['start_time', 'artist_id', 'venue_id'])
@@ -0,0 +1,122 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+from flask_sqlalchemy import SQLAlchemy
+
+# bound to the app in create_app()
+db = SQLAlchemy()
+
+#----------------------------------------------------------------------------#
+# Models.
+#----------------------------------------------------------------------------#
+
+class Show(db.Model):
+  __tablename__ = 'Show'
+  __table_args__ = (
+    db.UniqueConstraint('start_time', 'artist_id', 'venue_id', name='uq_Show_start_time_artist_id_venue_id'),
+    # the shows of one venue or artist, in time order
+    db.Index('ix_Show_venue_id_start_time', 'venue_id', 'start_time'),
+    db.Index('ix_Show_artist_id_start_time', 'artist_id', 'start_time'),
+  )
+
+  id = db.Column(db.Integer, primary_key=True)
+  start_time = db.Column('start_time',db.DateTime, nullable=False)
+  artist_id = db.Column('artist_id',db.Integer, db.ForeignKey('Artist.id'), nullable=False)
+  venue_id = db.Column('venue_id',db.Integer, db.ForeignKey('Venue.id'), nullable=False)
+#  venue = db.relationship('Venue', backref=db.backref('shows', lazy=True))
+#  artist = db.relationship('Artist', backref=db.backref('shows', lazy=True))
+  def __repr__(self):
+    return '<Show with Artist {} and Venue {} at {}>'.format(self.artist_id, self.venue_id, self.start_time)
+
+
+
+venue_genres = db.Table('VenueGenre',
+  db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'), primary_key=True),
+  db.Column('venue_id', db.Integer, db.ForeignKey('Venue.id'), primary_key=True, index=True)
+)
+
+artist_genres = db.Table('ArtistGenre',
+  db.Column('genre_id', db.Integer, db.ForeignKey('Genre.id'), primary_key=True),
+  db.Column('artist_id', db.Integer, db.ForeignKey('Artist.id'), primary_key=True, index=True)
+)
+
+class Genre(db.Model):
+  __tablename__ = 'Genre'
+
+  id = db.Column(db.Integer, primary_key=True)
+  name = db.Column(db.String(120), nullable=False, unique=True)
+
+  @classmethod
+  def lookup(cls, names):
+    """
+      Returns the Genre rows for a list of genre names, adding the ones that do not exist yet
+    """
+    names = [name.strip() for name in names if name and name.strip()]
+    genres = {genre.name: genre for genre in cls.query.filter(cls.name.in_(names)).all()} if names else {}
+    for name in names:
+      if name not in genres:
+        genres[name] = cls(name=name)
+        db.session.add(genres[name])
+    return [genres[name] for name in dict.fromkeys(names)]
+
+  def __repr__(self):
+    return '<Genre {} id: {}>'.format(self.name, self.id)
+
+class Venue(db.Model):
+    __tablename__ = 'Venue'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String, nullable=False)
+    city = db.Column(db.String(120), nullable=False)
+    state = db.Column(db.String(120), index=True)
+    address = db.Column(db.String(120))
+    phone = db.Column(db.String(120))
+    genres = db.relationship('Genre', secondary=venue_genres, lazy=True, order_by='Genre.name')
+    website = db.Column(db.String(255))
+    image_link = db.Column(db.String(500))
+    facebook_link = db.Column(db.String(120))
+    seeking_talent = db.Column(db.Boolean,default=False)
+    seeking_description = db.Column(db.String())
+    # maintained by count_new_shows(), delete_shows_of() and refresh_upcoming_show_counts()
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    shows = db.relationship('Show', lazy=True, backref=db.backref('venue', lazy=True))
+
+    def __repr__(self):
+      return '<Venue {} id: {}, city: {}, state: {}, address: {}, phone: {}>'.format(self.name, self.id, self.city, self.state, self.address, self.phone)
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate
+
+class Artist(db.Model):
+    __tablename__ = 'Artist'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String)
+    city = db.Column(db.String(120))
+    state = db.Column(db.String(120), index=True)
+    phone = db.Column(db.String(120))
+    genres = db.relationship('Genre', secondary=artist_genres, lazy=True, order_by='Genre.name')
+    image_link = db.Column(db.String(500))
+    website = db.Column(db.String(255))
+    facebook_link = db.Column(db.String(120))
+    seeking_venue = db.Column(db.Boolean, default=False)
+    seeking_description = db.Column(db.String())
+    # maintained by count_new_shows(), delete_shows_of() and refresh_upcoming_show_counts()
+    upcoming_shows_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    shows = db.relationship('Show', lazy=True, backref=db.backref('artist', lazy=True))
+
+    def __repr__(self):
+      return """<Artist {} 
+                  id:{}, city:{}, state:{}, 
+                  phone: {}, genres: {}, website: {}, 
+                  image_link: {}, facebook_link: {}, 
+                  seeking_venue: {}, seeking_description: {}
+                  >""".format(self.name, 
+                              self.id, self.city, self.state, 
+                              self.phone, self.genres, self.website,
+                              self.image_link, self.facebook_link,
+                              self.seeking_venue, self.seeking_description)
+
+    # TODO: implement any missing fields, as a database migration using Flask-Migrate
+
+# TODO Implement Show and Artist models, and complete all model relationships and properties, as a database migration.
@@ -0,0 +1,192 @@
+#----------------------------------------------------------------------------#
+# Opt-in request profiling.
+#
+# Enabled with PROFILE_REQUESTS. Every request gets its wall time, SQL
+# statement count and duration and template render time measured and sent
+# back in a Server-Timing header. Requests slower than PROFILE_SLOW_REQUEST_MS
+# and statements slower than PROFILE_SLOW_QUERY_MS are logged with their
+# figures as extra fields to the "<app>.profile" logger. A share of requests (PROFILE_SAMPLE_RATE), and any
+# request sent with an "X-Profile: 1" header, runs under cProfile or
+# pyinstrument and has its profile written to PROFILE_DIR.
+#----------------------------------------------------------------------------#
+
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime
+
+from flask import request
+
+from metrics import ContextLocal, listen_once
+
+
+class RequestProfiler(object):
+  """
+    Measures requests, logs slow requests and statements and dumps sampled profiles.
+    Configured by PROFILE_REQUESTS, PROFILE_SLOW_REQUEST_MS, PROFILE_SLOW_QUERY_MS,
+    PROFILE_SAMPLE_RATE, PROFILE_ENGINE ('cprofile' or 'pyinstrument') and PROFILE_DIR.
+  """
+
+  def __init__(self, app=None):
+    self.enabled = False
+    self._request = ContextLocal()
+    self._lock = threading.Lock()
+    if app is not None:
+      self.init_app(app)
+
+  def init_app(self, app):
+    self.enabled = app.config.get('PROFILE_REQUESTS', False)
+    if not self.enabled:
+      return
+    self.slow_request = app.config.get('PROFILE_SLOW_REQUEST_MS', 500) / 1000.0
+    self.slow_query = app.config.get('PROFILE_SLOW_QUERY_MS', 100) / 1000.0
+    self.sample_rate = app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+    self.engine = app.config.get('PROFILE_ENGINE', 'cprofile')
+    self.directory = app.config.get('PROFILE_DIR', os.path.join(app.root_path, 'profiles'))
+    self.logger = logging.getLogger(app.logger.name + '.profile')
+
+    # listeners of this app's engine only, every app has its own
+    engine = app.extensions['sqlalchemy'].db.get_engine(app)
+    listen_once(engine, 'before_cursor_execute', self._before_cursor_execute)
+    listen_once(engine, 'after_cursor_execute', self._after_cursor_execute)
+    listen_once(engine, 'handle_error', self._handle_error)
+
+    profiler = self
+
+    class TimedTemplate(app.jinja_env.template_class):
+      def render(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+          return super(TimedTemplate, self).render(*args, **kwargs)
+        finally:
+          profiler._template_rendered(time.perf_counter() - started)
+
+    app.jinja_env.template_class = TimedTemplate
+
+    app.before_request(self._before_request)
+    app.after_request(self._after_request)
+    app.teardown_request(self._teardown_request)
+
+  def log(self, event_name, level=logging.WARNING, **fields):
+    """
+      Logs an event with its fields as extra attributes (JSON fields with LOG_FORMAT 'json')
+    """
+    fields['event'] = event_name
+    self.logger.log(level, '%s %s', event_name,
+                    ' '.join('{}={}'.format(name, value) for name, value in sorted(fields.items()) if name != 'event'),
+                    extra=fields, stacklevel=2)
+
+  #  SQL and template timing
+  #  ----------------------------------------------------------------
+
+  def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('profile_started', []).append(time.perf_counter())
+
+  def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['profile_started'].pop()
+    active = getattr(self._request, 'active', False)
+    if active:
+      # concurrent_queries() workers add to the figures of their request
+      with self._lock:
+        self._request.queries += 1
+        self._request.query_seconds += elapsed
+    if elapsed >= self.slow_query:
+      self.log('slow_query',
+               duration_ms=round(elapsed * 1000, 3),
+               statement=' '.join(statement.split())[:2000],
+               executemany=executemany,
+               path=request.path if active else None)
+
+  def _handle_error(self, context):
+    if context.connection is not None and context.connection.info.get('profile_started'):
+      context.connection.info['profile_started'].pop()
+
+  def _template_rendered(self, seconds):
+    if getattr(self._request, 'active', False):
+      self._request.template_seconds += seconds
+
+  #  Request hooks
+  #  ----------------------------------------------------------------
+
+  def _before_request(self):
+    state = self._request
+    state.reset()
+    state.active = True
+    state.started = time.perf_counter()
+    state.queries = 0
+    state.query_seconds = 0.0
+    state.template_seconds = 0.0
+    state.profile = None
+    if request.headers.get('X-Profile') == '1' or random.random() < self.sample_rate:
+      state.profile = self._start_profile()
+
+  def _after_request(self, response):
+    state = self._request
+    if not getattr(state, 'active', False):
+      return response
+    elapsed = time.perf_counter() - state.started
+    response.headers['Server-Timing'] = 'db;desc="{} statements";dur={:.3f}, tpl;dur={:.3f}, total;dur={:.3f}'.format(
+      state.queries, state.query_seconds * 1000, state.template_seconds * 1000, elapsed * 1000)
+    if elapsed >= self.slow_request:
+      self.log('slow_request',
+               method=request.method,
+               path=request.full_path if request.query_string else request.path,
+               endpoint=request.endpoint,
+               status=response.status_code,
+               duration_ms=round(elapsed * 1000, 3),
+               queries=state.queries,
+               query_ms=round(state.query_seconds * 1000, 3),
+               template_ms=round(state.template_seconds * 1000, 3))
+    if state.profile is not None:
+      path = self._stop_profile(state.profile)
+      state.profile = None
+      if path:
+        response.headers['X-Profile-Dump'] = os.path.basename(path)
+    return response
+
+  def _teardown_request(self, exc=None):
+    state = self._request
+    if getattr(state, 'profile', None) is not None:
+      self._stop_profile(state.profile)
+      state.profile = None
+    state.active = False
+
+  #  Profiles
+  #  ----------------------------------------------------------------
+
+  def _start_profile(self):
+    if self.engine == 'pyinstrument':
+      from pyinstrument import Profiler
+      profile = Profiler()
+      profile.start()
+      return profile
+    import cProfile
+    profile = cProfile.Profile()
+    try:
+      profile.enable()
+    except ValueError:
+      # another request on this interpreter is already being profiled
+      return None
+    return profile
+
+  def _stop_profile(self, profile):
+    """
+      Stops the profile of the current request and writes it to PROFILE_DIR,
+      returns the path of the dump
+    """
+    name = '{}-{}-{}'.format(datetime.now().strftime('%Y%m%d-%H%M%S-%f'),
+                             request.endpoint or 'unknown', request.method.lower())
+    os.makedirs(self.directory, exist_ok=True)
+    if self.engine == 'pyinstrument':
+      profile.stop()
+      path = os.path.join(self.directory, name + '.html')
+      with open(path, 'w', encoding='utf-8') as f:
+        f.write(profile.output_html())
+    else:
+      profile.disable()
+      path = os.path.join(self.directory, name + '.prof')
+      profile.dump_stats(path)
+    self.log('profile', logging.INFO, path=path, endpoint=request.endpoint)
+    return path
@@ -0,0 +1,77 @@
+#----------------------------------------------------------------------------#
+# Double-booking checks of new shows.
+#
+# Shows have no end time: a show takes its venue and its artist for one slot
+# (SHOW_SLOT_MINUTES) from its start, so a new show conflicts with every show
+# of the same venue or artist starting less than a slot before or after it.
+# The shows booked around a batch of new shows are read with one range query,
+# served by the (venue_id, start_time) and (artist_id, start_time) indexes;
+# the conflicts of each row are then found in memory by bisection.
+#----------------------------------------------------------------------------#
+
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from models import db, Show
+
+
+def lock_schedules(venue_ids, artist_ids):
+  """
+    On PostgreSQL, takes transaction scoped advisory locks on the schedules of
+    the given venues and artists, so that concurrent bookings of the same venue
+    or artist are checked one after the other. Locks are taken in a fixed order
+    to avoid deadlocks and released on commit or rollback.
+  """
+  if db.engine.dialect.name != 'postgresql':
+    return
+  keys = sorted({(1, venue_id) for venue_id in venue_ids} | {(2, artist_id) for artist_id in artist_ids})
+  for kind, entity_id in keys:
+    db.session.execute(db.text('SELECT pg_advisory_xact_lock(:kind, :id)'), {'kind': kind, 'id': entity_id})
+
+
+class Schedule(object):
+  """
+    The shows booked around a list of new shows, by venue and by artist:
+    - rows: dicts with start_time, venue_id and artist_id
+    - slot: timedelta a show takes its venue and artist for
+  """
+
+  def __init__(self, rows, slot):
+    self.slot = max(slot, timedelta(microseconds=1))
+    self._starts = {}
+    self._shows = {}
+    if not rows:
+      return
+    starts = [row['start_time'] for row in rows]
+    venue_ids = {row['venue_id'] for row in rows}
+    artist_ids = {row['artist_id'] for row in rows}
+    booked = db.session.query(Show.id, Show.start_time, Show.venue_id, Show.artist_id).filter(
+      Show.start_time > min(starts) - self.slot,
+      Show.start_time < max(starts) + self.slot,
+      db.or_(Show.venue_id.in_(venue_ids), Show.artist_id.in_(artist_ids))
+    )
+    for show_id, start_time, venue_id, artist_id in booked:
+      self.add({'show_id': show_id, 'start_time': start_time, 'venue_id': venue_id, 'artist_id': artist_id})
+
+  def add(self, show):
+    """
+      Books a show (a dict with start_time, venue_id and artist_id) in the schedule
+    """
+    for key in (('venue', show['venue_id']), ('artist', show['artist_id'])):
+      starts = self._starts.setdefault(key, [])
+      position = bisect_right(starts, show['start_time'])
+      starts.insert(position, show['start_time'])
+      self._shows.setdefault(key, []).insert(position, show)
+
+  def conflicts(self, row):
+    """
+      Returns the booked shows overlapping row, each as (reason, show) where
+      reason is 'venue' or 'artist'
+    """
+    found = []
+    for key in (('venue', row['venue_id']), ('artist', row['artist_id'])):
+      starts = self._starts.get(key, [])
+      first = bisect_right(starts, row['start_time'] - self.slot)
+      last = bisect_left(starts, row['start_time'] + self.slot)
+      found.extend((key[0], show) for show in self._shows.get(key, [])[first:last])
+    return found
@@ -0,0 +1,171 @@
+#----------------------------------------------------------------------------#
+# Name search for venues and artists.
+#
+# On PostgreSQL the search runs as ILIKE on the name, served by a pg_trgm GIN
+# index (migration 3c1f8e2d9a47) and ranked by trigram similarity. Other
+# databases (SQLite in development) use an in-process trigram index of all
+# names instead, which gives the same matches and the same ranking. Writes in
+# the same process drop that index at once, other worker processes load it
+# again when its ttl runs out.
+#----------------------------------------------------------------------------#
+
+import heapq
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from sqlalchemy import func
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def trigrams(text):
+  """
+    Returns the set of trigrams of text the way pg_trgm builds them:
+    lower case words, padded with two blanks in front and one behind
+  """
+  grams = set()
+  for word in _WORD.findall(text.lower()):
+    word = '  {} '.format(word)
+    grams.update(word[i:i + 3] for i in range(len(word) - 2))
+  return grams
+
+
+def similarity(a, b):
+  """
+    Trigram similarity of two strings as computed by pg_trgm's similarity()
+  """
+  return _similarity(trigrams(a), trigrams(b))
+
+
+def _similarity(grams_a, grams_b):
+  if not grams_a or not grams_b:
+    return 0.0
+  return len(grams_a & grams_b) / float(len(grams_a | grams_b))
+
+
+def like_pattern(term):
+  """
+    Escapes LIKE wildcards in term and wraps it for a partial match
+  """
+  return '%{}%'.format(term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
+
+
+class SearchBackend(ABC):
+  """
+    Case-insensitive partial name search over the id and name columns of a model
+  """
+
+  def __init__(self, db, model):
+    self.db = db
+    self.model = model
+
+  @abstractmethod
+  def search(self, term, limit, ttl=300):
+    """
+      Returns up to limit (id, name) tuples whose name contains term, best match first;
+      ttl: seconds a backend may keep the names in the process
+    """
+
+  def invalidate(self):
+    """
+      Called after names of the model have been inserted, changed or deleted
+    """
+    pass
+
+
+class PostgresSearchBackend(SearchBackend):
+  """
+    Search in the database, ILIKE is answered from the trigram index on name
+  """
+
+  def search(self, term, limit, ttl=300):
+    model = self.model
+    return self.db.session.query(model.id, model.name).filter(
+      model.name.ilike(like_pattern(term), escape='\\')
+    ).order_by(
+      func.similarity(model.name, term).desc(), model.name, model.id
+    ).limit(limit).all()
+
+
+class InMemorySearchBackend(SearchBackend):
+  """
+    Search in a trigram index of all names held by the process.
+    The index is loaded with one query on first use and dropped by invalidate()
+    or when it is older than the ttl of the search.
+  """
+
+  def __init__(self, db, model):
+    super(InMemorySearchBackend, self).__init__(db, model)
+    self._lock = threading.Lock()
+    self._names = None
+    self._postings = None
+    self._expires = 0.0
+
+  def _load(self, ttl):
+    with self._lock:
+      if self._names is None or self._expires < time.monotonic():
+        names = {}
+        postings = {}
+        for entity_id, name in self.db.session.query(self.model.id, self.model.name):
+          name = name or ''
+          names[entity_id] = name
+          lowered = name.lower()
+          for i in range(len(lowered) - 2):
+            postings.setdefault(lowered[i:i + 3], set()).add(entity_id)
+        self._postings = postings
+        self._names = names
+        self._expires = time.monotonic() + ttl
+      return self._names, self._postings
+
+  def search(self, term, limit, ttl=300):
+    names, postings = self._load(ttl)
+    lowered = term.lower()
+    if len(lowered) >= 3:
+      candidates = None
+      for i in range(len(lowered) - 2):
+        ids = postings.get(lowered[i:i + 3], set())
+        candidates = ids if candidates is None else candidates & ids
+        if not candidates:
+          return []
+    else:
+      candidates = names.keys()
+
+    term_grams = trigrams(term)
+    matches = ((entity_id, names[entity_id]) for entity_id in candidates
+               if lowered in names[entity_id].lower())
+    return heapq.nsmallest(limit, matches,
+                           key=lambda m: (-_similarity(trigrams(m[1]), term_grams), m[1], m[0]))
+
+  def invalidate(self):
+    with self._lock:
+      self._names = None
+      self._postings = None
+
+
+class SearchIndex(object):
+  """
+    Name search of one model, picks the backend for the bound database on first use
+  """
+
+  def __init__(self, db, model):
+    self.db = db
+    self.model = model
+    self._backend = None
+
+  @property
+  def backend(self):
+    if self._backend is None:
+      if self.db.engine.dialect.name == 'postgresql':
+        self._backend = PostgresSearchBackend(self.db, self.model)
+      else:
+        self._backend = InMemorySearchBackend(self.db, self.model)
+    return self._backend
+
+  def search(self, term, limit, ttl=300):
+    return self.backend.search(term or '', limit, ttl)
+
+  def invalidate(self):
+    if self._backend is not None:
+      self._backend.invalidate()
@@ -2,3 +2,26 @@ window.parseISOString = function parseISOString(s) {
   var b = s.split(/\D+/);
   return new Date(Date.UTC(b[0], --b[1], b[2], b[3], b[4], b[5], b[6]));
 };
+
+// fills the datalist of inputs with a data-autocomplete URL (show form, large catalogs)
+document.addEventListener('input', function (event) {
+  var input = event.target;
+  if (!input.dataset || !input.dataset.autocomplete || input.value.length < 2) {
+    return;
+  }
+  clearTimeout(input.autocompleteTimer);
+  input.autocompleteTimer = setTimeout(function () {
+    fetch(input.dataset.autocomplete + '?q=' + encodeURIComponent(input.value))
+      .then(function (response) { return response.json(); })
+      .then(function (data) {
+        var list = document.getElementById(input.getAttribute('list'));
+        list.innerHTML = '';
+        data.results.forEach(function (result) {
+          var option = document.createElement('option');
+          option.value = result.id;
+          option.label = result.name;
+          list.appendChild(option);
+        });
+      });
+  }, 200);
+});
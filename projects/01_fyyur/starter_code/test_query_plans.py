@@ -0,0 +1,112 @@
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+# a seeded SQLite file unless DATABASE_URL points to a (scratch!) database
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'fyyur_plans.db'))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks'))
+
+from sqlalchemy import event
+
+from app import create_app
+from models import db
+from extensions import page_cache
+from cache import NullCache
+from seed import seed
+
+app = create_app()
+# the same app running the show queries of a page on query_executor
+concurrent_app = create_app({'CONCURRENT_QUERIES': True, 'PROFILE_REQUESTS': True})
+
+VENUES = int(os.environ.get('PLAN_TEST_VENUES', 2000))
+ARTISTS = int(os.environ.get('PLAN_TEST_ARTISTS', 2000))
+SHOWS = int(os.environ.get('PLAN_TEST_SHOWS', 200000))
+
+
+class QueryPlanTestCase(unittest.TestCase):
+    """Asserts that the venue and artist pages read Show through its indexes"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.context = app.app_context()
+        cls.context.push()
+        seed(venues=VENUES, artists=ARTISTS, shows=SHOWS)
+        db.session.execute('ANALYZE')
+        db.session.commit()
+        page_cache.backend = NullCache()
+
+    @classmethod
+    def tearDownClass(cls):
+        db.session.remove()
+        cls.context.pop()
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.record)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.record)
+
+    def record(self, conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith('EXPLAIN'):
+            self.statements.append((statement, parameters))
+
+    def show_statements(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        statements = [(s, p) for s, p in self.statements if 'FROM "Show"' in s]
+        self.assertTrue(statements)
+        return statements
+
+    def plan(self, statement, parameters):
+        if db.engine.dialect.name == 'postgresql':
+            rows = db.engine.execute('EXPLAIN ' + statement, parameters).fetchall()
+            return '\n'.join(row[0] for row in rows)
+        rows = db.engine.execute('EXPLAIN QUERY PLAN ' + statement, parameters).fetchall()
+        return '\n'.join(row[-1] for row in rows)
+
+    def assertIndexScan(self, url, index):
+        self.assertIndexScans(self.show_statements(url), index)
+
+    def assertIndexScans(self, statements, *indexes):
+        for statement, parameters in statements:
+            plan = self.plan(statement, parameters)
+            for index in indexes:
+                self.assertIn(index, plan, '{}\n{}'.format(statement, plan))
+            self.assertNotIn('Seq Scan on "Show"', plan, plan)
+            self.assertNotRegex(plan, r'SCAN (TABLE )?"?Show"?( |$)', plan)
+
+    def test_venue_page_uses_venue_index(self):
+        self.assertIndexScan('/venues/{}'.format(VENUES // 2), 'ix_Show_venue_id_start_time')
+
+    def test_artist_page_uses_artist_index(self):
+        self.assertIndexScan('/artists/{}'.format(ARTISTS // 2), 'ix_Show_artist_id_start_time')
+
+    def test_concurrent_queries_are_counted(self):
+        url = '/venues/{}'.format(VENUES // 2)
+        expected = int(self.client.get(url).headers['X-Query-Count'])
+        # the scoped session of this thread is bound to app, concurrent_app needs its own
+        db.session.remove()
+        try:
+            response = concurrent_app.test_client().get(url)
+        finally:
+            db.session.remove()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(int(response.headers['X-Query-Count']), expected)
+        self.assertIn('db;desc="{} statements"'.format(expected), response.headers['Server-Timing'])
+
+    def test_show_conflict_check_uses_both_indexes(self):
+        from scheduling import Schedule
+        Schedule([{'venue_id': VENUES // 2, 'artist_id': ARTISTS // 2, 'start_time': datetime.today()}],
+                 timedelta(hours=3))
+        statements = [(s, p) for s, p in self.statements if 'FROM "Show"' in s]
+        self.assertEqual(len(statements), 1)
+        self.assertIndexScans(statements, 'ix_Show_venue_id_start_time', 'ix_Show_artist_id_start_time')
+
+
+# Make the tests conveniently executable
+if __name__ == "__main__":
+    unittest.main()
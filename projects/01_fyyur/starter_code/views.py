@@ -0,0 +1,1179 @@
+#----------------------------------------------------------------------------#
+# Imports
+#----------------------------------------------------------------------------#
+
+import contextvars
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, current_app, render_template, request, Response, flash, redirect, url_for, stream_with_context, jsonify
+from models import db, Show, Genre, Venue, Artist, venue_genres, artist_genres
+from extensions import page_cache
+from search import SearchIndex
+from choices import ChoiceList
+from scheduling import Schedule, lock_schedules
+
+# forms (WTForms), dateutil and Babel are imported where they are used, so
+# that importing this module stays cheap for the CLI and short-lived tools
+
+#----------------------------------------------------------------------------#
+# Blueprint.
+#----------------------------------------------------------------------------#
+
+bp = Blueprint('main', __name__)
+
+venue_search = SearchIndex(db, Venue)
+artist_search = SearchIndex(db, Artist)
+venue_choices = ChoiceList(db, Venue)
+artist_choices = ChoiceList(db, Artist)
+
+#----------------------------------------------------------------------------#
+# Filters.
+#----------------------------------------------------------------------------#
+
+def parse_any_datetime(value):
+  import dateutil.parser
+  return dateutil.parser.parse(value)
+
+DATETIME_FORMATS = {
+  'full': "EEEE MMMM, d, y 'at' h:mma",
+  'medium': "EE MM, dd, y h:mma",
+}
+
+# the format the controllers used to hand show times to the templates
+ISO_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.000Z"
+
+def parse_datetime_value(value):
+  """
+    Returns value as naive UTC datetime: datetimes as they are, strings in
+    ISO_DATETIME_FORMAT without dateutil, anything else through dateutil
+  """
+  if isinstance(value, datetime):
+    date = value
+  elif len(value) == 24 and value.endswith('.000Z'):
+    try:
+      return datetime.fromisoformat(value[:19])
+    except ValueError:
+      date = parse_any_datetime(value)
+  else:
+    date = parse_any_datetime(value)
+  if date.tzinfo is not None:
+    date = date.astimezone(timezone.utc).replace(tzinfo=None)
+  return date
+
+@lru_cache(maxsize=64)
+def datetime_formatter(format, locale):
+  """
+    Returns a function formatting a datetime with a Babel pattern in a locale,
+    parsing the pattern and loading the locale data once per (format, locale)
+  """
+  import babel.dates
+  pattern = babel.dates.parse_pattern(DATETIME_FORMATS.get(format, format))
+  locale = babel.Locale.parse(locale)
+  return lambda date: pattern.apply(date, locale)
+
+@bp.app_template_filter('datetime')
+def format_datetime(value, format='medium', locale=None):
+  if locale is None:
+    import babel.dates
+    locale = babel.dates.LC_TIME
+  return datetime_formatter(format, locale)(parse_datetime_value(value))
+
+#----------------------------------------------------------------------------#
+# Queries.
+#----------------------------------------------------------------------------#
+
+# created when the blueprint is registered, threads are only started by the first
+# concurrent_queries() call (so not in a preforking parent process)
+query_executor = None
+
+@bp.record_once
+def create_query_executor(state):
+  global query_executor
+  query_executor = ThreadPoolExecutor(max_workers=state.app.config['QUERY_WORKERS'], thread_name_prefix='fyyur-query')
+
+def _in_app_context(app, query):
+  with app.app_context():
+    return query()
+
+def concurrent_queries(*queries):
+  """
+    Runs independent functions that each build and run a query and returns their results in order.
+    With CONCURRENT_QUERIES they run at the same time on query_executor, each in its own app
+    context and so with its own session and connection; the returned objects come back detached
+    and must have everything the caller uses loaded. Each runs in a copy of the caller's
+    contextvars, so the per-request query counters of metrics and profiling include it.
+  """
+  if not current_app.config['CONCURRENT_QUERIES'] or len(queries) < 2:
+    return [query() for query in queries]
+  app = current_app._get_current_object()
+  futures = [query_executor.submit(contextvars.copy_context().run, _in_app_context, app, query) for query in queries]
+  return [future.result() for future in futures]
+
+def split_shows(column, entity_id, related):
+  """
+    Loads the shows of one venue or artist split at the database into past and upcoming:
+    - column: Show.venue_id or Show.artist_id
+    - entity_id: id of the venue or artist
+    - related: Show.artist or Show.venue, joined into the same query
+    Upcoming shows come in ascending order, past shows newest first and capped
+    by PAST_SHOWS_LIMIT. Returns (past_shows, upcoming_shows, past_shows_count).
+  """
+  now = datetime.today()
+  limit = current_app.config.get('PAST_SHOWS_LIMIT')
+
+  def shows():
+    return Show.query.options(
+      db.joinedload(related).load_only('name', 'image_link')
+    ).filter(column == entity_id)
+
+  def upcoming():
+    return shows().filter(Show.start_time > now).order_by(Show.start_time).all()
+
+  def past():
+    past_query = shows().filter(Show.start_time <= now).order_by(Show.start_time.desc())
+    return past_query.limit(limit).all() if limit else past_query.all()
+
+  upcoming_shows, past_shows = concurrent_queries(upcoming, past)
+  past_shows_count = len(past_shows)
+  if limit and past_shows_count == limit:
+    past_shows_count = Show.query.filter(column == entity_id, Show.start_time <= now).count()
+
+  return past_shows, upcoming_shows, past_shows_count
+
+def upcoming_show_counts(model, ids):
+  """
+    Reads the maintained upcoming show counters of several venues or artists:
+    - model: Venue or Artist
+    - ids: ids of the venues or artists
+    Returns a dict from id to count.
+  """
+  if not ids:
+    return {}
+  return dict(db.session.query(model.id, model.upcoming_shows_count).filter(model.id.in_(ids)).all())
+
+def count_new_shows(rows):
+  """
+    Increments the upcoming show counters of the venues and artists of new shows,
+    with one executemany UPDATE per side, to be committed together with the shows:
+    - rows: dicts with start_time, venue_id and artist_id
+  """
+  now = datetime.today()
+  for model, key in ((Venue, 'venue_id'), (Artist, 'artist_id')):
+    counts = {}
+    for row in rows:
+      if row['start_time'] > now:
+        counts[row[key]] = counts.get(row[key], 0) + 1
+    if counts:
+      db.session.execute(model.__table__.update().where(model.id == db.bindparam('entity_id')).values(
+        upcoming_shows_count=model.upcoming_shows_count + db.bindparam('count')),
+        [{'entity_id': entity_id, 'count': count} for entity_id, count in counts.items()])
+
+def delete_shows_of(column, entity_id):
+  """
+    Deletes all shows of a venue or artist before the venue or artist itself is deleted
+    and decrements the upcoming show counters of the artists or venues they were booked with:
+    - column: Show.venue_id or Show.artist_id
+    - entity_id: id of the venue or artist
+  """
+  other_model, other_column = (Artist, Show.artist_id) if column is Show.venue_id else (Venue, Show.venue_id)
+  booked = db.session.query(other_column, db.func.count(other_column)).filter(
+    column == entity_id, Show.start_time > datetime.today()
+  ).group_by(other_column).all()
+  for other_id, count in booked:
+    other_model.query.filter(other_model.id == other_id).update(
+      {other_model.upcoming_shows_count: other_model.upcoming_shows_count - count}, synchronize_session=False)
+  Show.query.filter(column == entity_id).delete(synchronize_session=False)
+
+def refresh_upcoming_show_counts(since=None):
+  """
+    Recounts the upcoming show counters from the Show table. With since, only venues
+    and artists having shows that started between since and now are recounted, which
+    ages the counters as shows move into the past; without since all are recounted.
+    Returns the number of updated venues and artists.
+  """
+  now = datetime.today()
+  updated = 0
+  for model, column in ((Venue, Show.venue_id), (Artist, Show.artist_id)):
+    count = db.select([db.func.count(column)]).where(
+      db.and_(column == model.id, Show.start_time > now)).as_scalar()
+    query = model.query
+    if since is not None:
+      query = query.filter(model.id.in_(
+        db.session.query(column).filter(Show.start_time > since, Show.start_time <= now)))
+    updated += query.update({model.upcoming_shows_count: count}, synchronize_session=False)
+  db.session.commit()
+  return updated
+
+def pages_showing(column, entity_id):
+  """
+    Returns the page cache keys of the pages showing a venue or artist:
+    - column: Show.venue_id or Show.artist_id
+    - entity_id: id of the venue or artist
+    These are its listing, its own page and the pages of the artists or venues
+    it has shows with. Call before the write is committed, since a delete
+    removes the shows.
+  """
+  if column is Show.venue_id:
+    own, other, other_column = 'venue', 'artist', Show.artist_id
+  else:
+    own, other, other_column = 'artist', 'venue', Show.venue_id
+  keys = [own + 's', '{}:{}'.format(own, entity_id)]
+  for (other_id,) in db.session.query(other_column).filter(column == entity_id).distinct():
+    keys.append('{}:{}'.format(other, other_id))
+  return keys
+
+def invalidate_pages(keys):
+  """
+    Drops the given pages and all pages of the /shows listing from the page cache
+  """
+  page_cache.invalidate(*keys)
+  page_cache.invalidate_prefix('shows:')
+
+SHOW_CURSOR_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+
+def encode_show_cursor(row):
+  """
+    Encodes the key (start_time, artist_id, venue_id) of a show row as ?after= cursor
+  """
+  return '{}_{}_{}'.format(row[0].strftime(SHOW_CURSOR_FORMAT), row[1], row[2])
+
+def decode_show_cursor(cursor):
+  """
+    Decodes a cursor of encode_show_cursor(), returns None for a missing or malformed cursor
+  """
+  try:
+    start_time, artist_id, venue_id = cursor.split('_')
+    return datetime.strptime(start_time, SHOW_CURSOR_FORMAT), int(artist_id), int(venue_id)
+  except (AttributeError, ValueError):
+    return None
+
+def show_row(row):
+  """
+    Formats a (start_time, artist_id, venue_id, venue_name, artist_name, artist_image_link) row for the shows page
+  """
+  start_time, artist_id, venue_id, venue_name, artist_name, artist_image_link = row
+  return {
+    "venue_id": venue_id,
+    "venue_name": venue_name,
+    "artist_id": artist_id,
+    "artist_name": artist_name,
+    "artist_image_link": artist_image_link,
+    "start_time": start_time
+  }
+
+def book_shows(rows, atomic=False):
+  """
+    Books new shows in one transaction and returns one result per row:
+    - rows: dicts with artist_id, venue_id and start_time as sent by the client
+    - atomic: book nothing if any row is invalid or conflicts
+    Each result has the row's index and a status: 'created', 'invalid' (with
+    errors), 'conflict' (with the conflicting shows, booked ones by show_id and
+    earlier rows of the batch by row) or, for valid rows of a failed atomic
+    batch, 'skipped'. Venues and artists are checked with one query each and
+    conflicts with one range query (see scheduling.py), the shows are inserted
+    with one executemany INSERT.
+  """
+  results, parsed = [], []
+  for index, row in enumerate(rows):
+    result, show = {'index': index, 'status': 'invalid', 'errors': []}, {}
+    for key in ('artist_id', 'venue_id'):
+      try:
+        show[key] = int(row.get(key))
+      except (TypeError, ValueError):
+        result['errors'].append('{} is not an id'.format(key))
+    try:
+      show['start_time'] = parse_datetime_value(row.get('start_time'))
+    except (TypeError, ValueError, OverflowError):
+      result['errors'].append('start_time is not a date and time')
+    results.append(result)
+    parsed.append(show)
+
+  venue_ids = {show['venue_id'] for show in parsed if 'venue_id' in show}
+  artist_ids = {show['artist_id'] for show in parsed if 'artist_id' in show}
+  venue_ids &= {venue_id for (venue_id,) in db.session.query(Venue.id).filter(Venue.id.in_(venue_ids))}
+  artist_ids &= {artist_id for (artist_id,) in db.session.query(Artist.id).filter(Artist.id.in_(artist_ids))}
+  for result, show in zip(results, parsed):
+    if 'venue_id' in show and show['venue_id'] not in venue_ids:
+      result['errors'].append('venue {} does not exist'.format(show['venue_id']))
+    if 'artist_id' in show and show['artist_id'] not in artist_ids:
+      result['errors'].append('artist {} does not exist'.format(show['artist_id']))
+
+  valid = [(result, show) for result, show in zip(results, parsed) if not result['errors']]
+  lock_schedules({show['venue_id'] for _, show in valid}, {show['artist_id'] for _, show in valid})
+  schedule = Schedule([show for _, show in valid], timedelta(minutes=current_app.config['SHOW_SLOT_MINUTES']))
+  accepted = []
+  for result, show in valid:
+    del result['errors']
+    conflicts = schedule.conflicts(show)
+    if conflicts:
+      result['status'] = 'conflict'
+      result['conflicts'] = [dict(
+        {key: booked[key] for key in ('show_id', 'row') if key in booked},
+        reason=reason, venue_id=booked['venue_id'], artist_id=booked['artist_id'],
+        start_time=booked['start_time'].isoformat()
+      ) for reason, booked in conflicts]
+    else:
+      schedule.add(dict(show, row=result['index']))
+      accepted.append((result, show))
+
+  if atomic and len(accepted) < len(rows):
+    for result, _ in accepted:
+      result['status'] = 'skipped'
+    db.session.rollback()
+    return results
+
+  shows = [show for _, show in accepted]
+  if shows:
+    db.session.execute(Show.__table__.insert(), shows)
+    count_new_shows(shows)
+  db.session.commit()
+  for result, _ in accepted:
+    result['status'] = 'created'
+  if shows:
+    invalidate_pages(['venues'] +
+                     ['venue:{}'.format(venue_id) for venue_id in {show['venue_id'] for show in shows}] +
+                     ['artist:{}'.format(artist_id) for artist_id in {show['artist_id'] for show in shows}])
+  return results
+
+def stream_template(template_name, **context):
+  """
+    Renders a template as a generator of chunks, to be wrapped in stream_with_context
+  """
+  current_app.update_template_context(context)
+  template = current_app.jinja_env.get_template(template_name)
+  return template.generate(context)
+
+def autocomplete(index):
+  """
+    Returns the venues or artists whose name contains ?q= as JSON, for the pickers of the show form:
+    - index: venue_search or artist_search
+  """
+  term = request.args.get('q', '').strip()
+  matches = index.search(term, current_app.config['AUTOCOMPLETE_RESULTS_LIMIT'], current_app.config['SEARCH_INDEX_TTL']) if term else []
+  return jsonify({'results': [{'id': entity_id, 'name': name} for entity_id, name in matches]})
+
+# ----------------------------------------------------------------------------#
+# Controllers.
+# ----------------------------------------------------------------------------#
+
+@bp.route('/')
+def index():
+  return render_template('pages/home.html')
+
+
+#  Venues
+#  ----------------------------------------------------------------
+
+@bp.route('/venues')
+@page_cache.cached(lambda: 'venues', etag=True)
+def venues():
+  # TODO: replace with real venues data.
+  #       num_shows should be aggregated based on number of upcoming shows per venue.
+  
+  rows = db.session.query(
+      Venue.city, Venue.state, Venue.id, Venue.name, Venue.upcoming_shows_count
+    ).order_by(Venue.city, Venue.state, Venue.name
+    ).all()
+
+  data = []
+  for city, state, venue_id, name, num_upcoming_shows in rows:
+    if not data or (data[-1]['city'], data[-1]['state']) != (city, state):
+      data.append({'city': city, 'state': state, 'venues': []})
+    data[-1]['venues'].append({'id': venue_id,
+                               'name': name,
+                               'num_upcoming_shows': num_upcoming_shows})
+
+#  print(data)
+  
+#  data=[{
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "venues": [{
+#      "id": 1,
+#      "name": "The Musical Hop",
+#      "num_upcoming_shows": 0,
+#    }, {
+#      "id": 3,
+#      "name": "Park Square Live Music & Coffee",
+#      "num_upcoming_shows": 1,
+#    }]
+#  }, {
+#    "city": "New York",
+#    "state": "NY",
+#    "venues": [{
+#      "id": 2,
+#      "name": "The Dueling Pianos Bar",
+#      "num_upcoming_shows": 0,
+#    }]
+#  }]
+  return render_template('pages/venues.html', areas=data);
+
+@bp.route('/venues/search', methods=['POST'])
+def search_venues():
+  # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for Hop should return "The Musical Hop".
+  # search for "Music" should return "The Musical Hop" and "Park Square Live Music & Coffee"
+  
+  search_term=request.form.get('search_term', '')
+
+  venues = venue_search.search(search_term, current_app.config['SEARCH_RESULTS_LIMIT'], current_app.config['SEARCH_INDEX_TTL'])
+  counts = upcoming_show_counts(Venue, [venue_id for venue_id, name in venues])
+
+  response={
+    "count": len(venues),
+    "data": [{"id": venue_id,
+              "name": name,
+              "num_upcoming_shows": counts.get(venue_id, 0)} for venue_id, name in venues]
+  }
+  
+ # response={
+ #   "count": 1,
+ #   "data": [{
+ #     "id": 2,
+ #     "name": "The Dueling Pianos Bar",
+ #     "num_upcoming_shows": 0,
+ #   }]
+ # }
+  return render_template('pages/search_venues.html', results=response, search_term=search_term)
+
+@bp.route('/venues/<int:venue_id>')
+@page_cache.cached(lambda venue_id: 'venue:{}'.format(venue_id), etag=True)
+def show_venue(venue_id):
+  # shows the venue page with the given venue_id
+  # TODO: replace with real venue data from the venues table, using venue_id
+  
+  venue = Venue.query.get(venue_id)
+
+  if venue is None:
+    flash('Venue with ID {} not found!'.format(venue_id))
+    return redirect(url_for('.index'))
+  else:
+    past_shows, upcoming_shows, past_shows_count = split_shows(Show.venue_id, venue_id, Show.artist)
+    data={
+     "id": venue.id,
+     "name": venue.name,
+      "genres": [genre.name for genre in venue.genres],
+      "city":venue.city,
+      "phone":venue.phone,
+      "address": venue.address,
+      "website": venue.website,
+     "facebook_link": venue.facebook_link,
+     "seeking_talent": venue.seeking_talent,
+     "seeking_description": venue.seeking_description,
+     "image_link": venue.image_link,
+     "past_shows": [{"artist_id": s.artist_id,
+                     "artist_name": s.artist.name,
+                     "artist_image_link": s.artist.image_link,
+                     "start_time": s.start_time} for s in past_shows],
+     "upcoming_shows": [{"artist_id": s.artist_id,
+                     "artist_name": s.artist.name,
+                     "artist_image_link": s.artist.image_link,
+                     "start_time": s.start_time} for s in upcoming_shows],
+     "past_shows_count": past_shows_count,
+     "upcoming_shows_count": len(upcoming_shows),
+   }
+  
+#  data1={
+#    "id": 1,
+#    "name": "The Musical Hop",
+#    "genres": ["Jazz", "Reggae", "Swing", "Classical", "Folk"],
+#    "address": "1015 Folsom Street",
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "phone": "123-123-1234",
+#    "website": "https://www.themusicalhop.com",
+#    "facebook_link": "https://www.facebook.com/TheMusicalHop",
+#    "seeking_talent": True,
+#    "seeking_description": "We are on the lookout for a local artist to play every two weeks. Please call us.",
+#    "image_link": "https://images.unsplash.com/photo-1543900694-133f37abaaa5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=400&q=60",
+#    "past_shows": [{
+#      "artist_id": 4,
+#      "artist_name": "Guns N Petals",
+#      "artist_image_link": "https://images.unsplash.com/photo-1549213783-8284d0336c4f?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=300&q=80",
+#      "start_time": "2019-05-21T21:30:00.000Z"
+#    }],
+#    "upcoming_shows": [],
+#    "past_shows_count": 1,
+#    "upcoming_shows_count": 0,
+#  }
+#  data2={
+#    "id": 2,
+#    "name": "The Dueling Pianos Bar",
+#    "genres": ["Classical", "R&B", "Hip-Hop"],
+#    "address": "335 Delancey Street",
+#    "city": "New York",
+#    "state": "NY",
+#    "phone": "914-003-1132",
+#    "website": "https://www.theduelingpianos.com",
+#    "facebook_link": "https://www.facebook.com/theduelingpianos",
+#    "seeking_talent": False,
+#    "image_link": "https://images.unsplash.com/photo-1497032205916-ac775f0649ae?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=750&q=80",
+#    "past_shows": [],
+#    "upcoming_shows": [],
+#    "past_shows_count": 0,
+#    "upcoming_shows_count": 0,
+#  }
+#  data3={
+#    "id": 3,
+#    "name": "Park Square Live Music & Coffee",
+#    "genres": ["Rock n Roll", "Jazz", "Classical", "Folk"],
+#    "address": "34 Whiskey Moore Ave",
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "phone": "415-000-1234",
+#    "website": "https://www.parksquarelivemusicandcoffee.com",
+#    "facebook_link": "https://www.facebook.com/ParkSquareLiveMusicAndCoffee",
+#    "seeking_talent": False,
+#    "image_link": "https://images.unsplash.com/photo-1485686531765-ba63b07845a7?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=747&q=80",
+#    "past_shows": [{
+#      "artist_id": 5,
+#      "artist_name": "Matt Quevedo",
+#      "artist_image_link": "https://images.unsplash.com/photo-1495223153807-b916f75de8c5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=334&q=80",
+#      "start_time": "2019-06-15T23:00:00.000Z"
+#    }],
+#    "upcoming_shows": [{
+#      "artist_id": 6,
+#      "artist_name": "The Wild Sax Band",
+#      "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#      "start_time": "2035-04-01T20:00:00.000Z"
+#    }, {
+#      "artist_id": 6,
+#      "artist_name": "The Wild Sax Band",
+#      "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#      "start_time": "2035-04-08T20:00:00.000Z"
+#    }, {
+#      "artist_id": 6,
+#      "artist_name": "The Wild Sax Band",
+#      "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#      "start_time": "2035-04-15T20:00:00.000Z"
+#    }],
+#    "past_shows_count": 1,
+#    "upcoming_shows_count": 1,
+#  }
+#  data = list(filter(lambda d: d['id'] == venue_id, [data1, data2, data3]))[0]
+  return render_template('pages/show_venue.html', venue=data)
+
+#  Create Venue
+#  ----------------------------------------------------------------
+
+@bp.route('/venues/create', methods=['GET'])
+def create_venue_form():
+  from forms import VenueForm
+  form = VenueForm()
+  return render_template('forms/new_venue.html', form=form)
+
+@bp.route('/venues/create', methods=['POST'])
+def create_venue_submission():
+  # TODO: insert form data as a new Venue record in the db, instead
+  # TODO: modify data to be the data object returned from db insertion
+  error = False
+  #print(request.form)
+
+  try:
+    venue = Venue(
+      name=request.form.get('name'),
+      city=request.form.get('city'),
+      state=request.form.get('state'),
+      address=request.form.get('address'),
+      genres=Genre.lookup(request.form.getlist('genres')),
+      phone=request.form.get('phone'),
+      image_link=request.form.get('image_link'),
+      facebook_link=request.form.get('facebook_link'),
+      website=request.form.get('website'),
+      seeking_talent=(request.form.get('seeking_talent')=='y'),
+      seeking_description=request.form.get('seeking_description')
+    )
+  
+    db.session.add(venue)
+    db.session.commit()
+    venue_search.invalidate()
+    venue_choices.invalidate()
+    page_cache.invalidate('venues')
+  except:
+    db.session.rollback()
+    error=True
+  finally:
+    db.session.close()
+
+  # on successful db insert, flash success
+  if not error:
+    flash('Venue ' + request.form['name'] + ' was successfully listed!')
+  else:
+    flash('An error occurred. Venue {} could not be created.'.format(request.form['name']))
+  # TODO: on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Venue ' + data.name + ' could not be listed.')
+  # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+  return render_template('pages/home.html')
+
+@bp.route('/venues/<venue_id>', methods=['DELETE'])
+def delete_venue(venue_id):
+  error = False
+  try:
+    venue = Venue.query.get(venue_id)
+    pages = pages_showing(Show.venue_id, venue.id)
+    delete_shows_of(Show.venue_id, venue.id)
+    db.session.delete(venue)
+    db.session.commit()
+    venue_search.invalidate()
+    venue_choices.invalidate()
+    invalidate_pages(pages)
+  except:
+    error = True
+    db.session.rollback()
+  finally:
+    db.session.close()
+  # TODO: Complete this endpoint for taking a venue_id, and using
+  # SQLAlchemy ORM to delete a record. Handle cases where the session commit could fail.
+
+  # BONUS CHALLENGE: Implement a button to delete a Venue on a Venue Page, have it so that
+  # clicking that button delete it from the db then redirect the user to the homepage
+  return jsonify({'success': not error})
+
+#  Artists
+#  ----------------------------------------------------------------
+@bp.route('/artists')
+@page_cache.cached(lambda: 'artists', etag=True)
+def artists():
+
+  artists = Artist.query.all()
+  # TODO: replace with real data returned from querying the database
+
+#  data=[{
+#    "id": 4,
+#    "name": "Guns N Petals",
+#  }, {
+#    "id": 5,
+#    "name": "Matt Quevedo",
+#  }, {
+#    "id": 6,
+#    "name": "The Wild Sax Band",
+#  }]
+  return render_template('pages/artists.html', artists=artists)
+
+@bp.route('/artists/search', methods=['POST'])
+def search_artists():
+  # TODO: implement search on artists with partial string search. Ensure it is case-insensitive.
+  # seach for "A" should return "Guns N Petals", "Matt Quevado", and "The Wild Sax Band".
+  # search for "band" should return "The Wild Sax Band".
+  search_term=request.form.get('search_term', '')
+
+  artists = artist_search.search(search_term, current_app.config['SEARCH_RESULTS_LIMIT'], current_app.config['SEARCH_INDEX_TTL'])
+  counts = upcoming_show_counts(Artist, [artist_id for artist_id, name in artists])
+  data = [{"id": artist_id,
+           "name": name,
+           "num_upcoming_shows": counts.get(artist_id, 0)} for artist_id, name in artists]
+  response={
+    "count": len(artists),
+    "data": data
+    #[{
+    #  "id": 4,
+    #  "name": "Guns N Petals",
+    #  "num_upcoming_shows": 0,
+    #}]
+
+
+  }
+  current_app.logger.debug('artist search %r: %d results', search_term, len(artists), extra={'payload': response})
+  return render_template('pages/search_artists.html', results=response, search_term=search_term)
+
+@bp.route('/artists/<int:artist_id>')
+@page_cache.cached(lambda artist_id: 'artist:{}'.format(artist_id), etag=True)
+def show_artist(artist_id):
+  # shows the venue page with the given venue_id
+  # TODO: replace with real venue data from the venues table, using venue_id
+  
+  artist = Artist.query.get(artist_id)
+  current_app.logger.debug('show artist %d: %r', artist_id, artist)
+  if artist is None:
+    flash('Artist with ID {} not found'.format(artist_id))
+    return redirect(url_for('.index'))
+  else:
+    past_shows, upcoming_shows, past_shows_count = split_shows(Show.artist_id, artist_id, Show.venue)
+    data = {
+    "id": artist.id,
+    "name": artist.name,
+    "genres": [genre.name for genre in artist.genres],
+    "city": artist.city,
+    "state": artist.state,
+    "phone": artist.phone,
+    "website": artist.website,
+    "facebook_link": artist.facebook_link,
+    "seeking_venue": artist.seeking_venue,
+    "seeking_description": artist.seeking_description,
+    "image_link": artist.image_link,
+    "past_shows": [{"venue_id": s.venue_id,
+                    "venue_name": s.venue.name,
+                    "venue_image_link": s.venue.image_link, 
+                    "start_time": s.start_time} for s in past_shows],
+    "upcoming_shows": [{"venue_id": s.venue_id,
+                        "venue_name": s.venue.name,
+                        "venue_image_link": s.venue.image_link, 
+                        "start_time": s.start_time} for s in upcoming_shows],
+    "past_shows_count": past_shows_count,
+    "upcoming_shows_count": len(upcoming_shows),
+    }
+
+#  data1={
+#    "id": 4,
+#    "name": "Guns N Petals",
+#    "genres": ["Rock n Roll"],
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "phone": "326-123-5000",
+#    "website": "https://www.gunsnpetalsband.com",
+#    "facebook_link": "https://www.facebook.com/GunsNPetals",
+#    "seeking_venue": True,
+#    "seeking_description": "Looking for shows to perform at in the San Francisco Bay Area!",
+#    "image_link": "https://images.unsplash.com/photo-1549213783-8284d0336c4f?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=300&q=80",
+#    "past_shows": [{
+#      "venue_id": 1,
+#      "venue_name": "The Musical Hop",
+#      "venue_image_link": "https://images.unsplash.com/photo-1543900694-133f37abaaa5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=400&q=60",
+#      "start_time": "2019-05-21T21:30:00.000Z"
+#    }],
+#    "upcoming_shows": [],
+#    "past_shows_count": 1,
+#    "upcoming_shows_count": 0,
+#  }
+#  data2={
+#    "id": 5,
+#    "name": "Matt Quevedo",
+#    "genres": ["Jazz"],
+#    "city": "New York",
+#    "state": "NY",
+#    "phone": "300-400-5000",
+#    "facebook_link": "https://www.facebook.com/mattquevedo923251523",
+#    "seeking_venue": False,
+#    "image_link": "https://images.unsplash.com/photo-1495223153807-b916f75de8c5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=334&q=80",
+#    "past_shows": [{
+#      "venue_id": 3,
+#      "venue_name": "Park Square Live Music & Coffee",
+#      "venue_image_link": "https://images.unsplash.com/photo-1485686531765-ba63b07845a7?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=747&q=80",
+#      "start_time": "2019-06-15T23:00:00.000Z"
+#    }],
+#    "upcoming_shows": [],
+#    "past_shows_count": 1,
+#    "upcoming_shows_count": 0,
+#  }
+#  data3={
+#    "id": 6,
+#    "name": "The Wild Sax Band",
+#    "genres": ["Jazz", "Classical"],
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "phone": "432-325-5432",
+#    "seeking_venue": False,
+#    "image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#    "past_shows": [],
+#    "upcoming_shows": [{
+#      "venue_id": 3,
+#      "venue_name": "Park Square Live Music & Coffee",
+#      "venue_image_link": "https://images.unsplash.com/photo-1485686531765-ba63b07845a7?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=747&q=80",
+#      "start_time": "2035-04-01T20:00:00.000Z"
+#    }, {
+#      "venue_id": 3,
+#      "venue_name": "Park Square Live Music & Coffee",
+#      "venue_image_link": "https://images.unsplash.com/photo-1485686531765-ba63b07845a7?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=747&q=80",
+#      "start_time": "2035-04-08T20:00:00.000Z"
+#    }, {
+#      "venue_id": 3,
+#      "venue_name": "Park Square Live Music & Coffee",
+#      "venue_image_link": "https://images.unsplash.com/photo-1485686531765-ba63b07845a7?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=747&q=80",
+#      "start_time": "2035-04-15T20:00:00.000Z"
+#    }],
+#    "past_shows_count": 0,
+#    "upcoming_shows_count": 3,
+#  }
+ # data = list(filter(lambda d: d['id'] == artist_id, [data1, data2, data3]))[0]
+  return render_template('pages/show_artist.html', artist=data)
+
+@bp.route('/artists/<int:artist_id>', methods=['DELETE'])
+def delete_artist(artist_id):
+  error = False
+  try:
+    artist = Artist.query.get(artist_id)
+    pages = pages_showing(Show.artist_id, artist.id)
+    delete_shows_of(Show.artist_id, artist.id)
+    db.session.delete(artist)
+    db.session.commit()
+    artist_search.invalidate()
+    artist_choices.invalidate()
+    invalidate_pages(pages)
+  except:
+    error = True
+    db.session.rollback()
+  finally:
+    db.session.close()
+  return jsonify({'success': not error})
+
+#  Update
+#  ----------------------------------------------------------------
+@bp.route('/artists/<int:artist_id>/edit', methods=['GET'])
+def edit_artist(artist_id):
+  artist = Artist.query.get(artist_id)
+  from forms import ArtistForm
+  form = ArtistForm(obj=artist)
+  form.genres.data = [genre.name for genre in artist.genres]
+  
+  # TODO: populate form with fields from artist with ID <artist_id>
+  return render_template('forms/edit_artist.html', form=form, artist=artist)
+
+@bp.route('/artists/<int:artist_id>/edit', methods=['POST'])
+def edit_artist_submission(artist_id):
+  # TODO: take values from the form submitted, and update existing
+  # artist record with ID <artist_id> using the new attributes
+  if current_app.logger.isEnabledFor(logging.DEBUG):
+    current_app.logger.debug('edit artist %d', artist_id, extra={'form': request.form.to_dict()})
+  artist = Artist.query.get(artist_id)
+  error = False
+  artist.name = request.form.get('name')
+  artist.genres = Genre.lookup(request.form.getlist("genres"))
+  artist.city = request.form.get("city")
+  artist.state = request.form.get("state")
+  artist.phone = request.form.get("phone")
+  artist.website = request.form.get("website")
+  artist.facebook_link = request.form.get("facebook_link")
+  artist.seeking_venue = (request.form.get("seeking_venue") == 'y')
+  artist.seeking_description = request.form.get("seeking_description")
+  artist.image_link = request.form.get("image_link")
+  
+  current_app.logger.debug('updated %r', artist)
+
+  try:
+    pages = pages_showing(Show.artist_id, artist_id)
+    db.session.commit()
+    artist_search.invalidate()
+    artist_choices.invalidate()
+    invalidate_pages(pages)
+  except:
+    error = True
+    db.session.rollback()
+  finally:
+    db.session.close()
+  if error:
+    flash('Artist {} could not be edited'.format(artist_id))
+  else:
+    flash('Artist {} successfully edited'.format(artist_id))
+  return redirect(url_for('.show_artist', artist_id=artist_id))
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['GET'])
+def edit_venue(venue_id):
+  
+  venue = Venue.query.get(venue_id)
+  from forms import VenueForm
+  form = VenueForm(obj=venue)
+  form.genres.data = [genre.name for genre in venue.genres]
+#  venue={
+#    "id": 1,
+#    "name": "The Musical Hop",
+#    "genres": ["Jazz", "Reggae", "Swing", "Classical", "Folk"],
+#    "address": "1015 Folsom Street",
+#    "city": "San Francisco",
+#    "state": "CA",
+#    "phone": "123-123-1234",
+#    "website": "https://www.themusicalhop.com",
+#    "facebook_link": "https://www.facebook.com/TheMusicalHop",
+#    "seeking_talent": True,
+#    "seeking_description": "We are on the lookout for a local artist to play every two weeks. Please call us.",
+#    "image_link": "https://images.unsplash.com/photo-1543900694-133f37abaaa5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=400&q=60"
+ # }
+  # TODO: populate form with values from venue with ID <venue_id>
+  return render_template('forms/edit_venue.html', form=form, venue=venue)
+
+@bp.route('/venues/<int:venue_id>/edit', methods=['POST'])
+def edit_venue_submission(venue_id):
+  if current_app.logger.isEnabledFor(logging.DEBUG):
+    current_app.logger.debug('edit venue %d', venue_id, extra={'form': request.form.to_dict()})
+  venue = Venue.query.get(venue_id)
+  venue.name = request.form.get("name")
+  venue.genres = Genre.lookup(request.form.getlist("genres"))
+  venue.address = request.form.get("address")
+  venue.city = request.form.get("city")
+  venue.state = request.form.get("state")
+  venue.phone = request.form.get("phone")
+  venue.website = request.form.get("website")
+  venue.facebook_link = request.form.get("facebook_link")
+  venue.seeking_talent = (request.form.get("seeking_talent") == 'y')
+  venue.seeking_description = request.form.get("seeking_description")
+  venue.image_link = request.form.get("image_link")
+  current_app.logger.debug('updated %r', venue)
+  error = False
+  try:
+    pages = pages_showing(Show.venue_id, venue_id)
+    db.session.commit()
+    venue_search.invalidate()
+    venue_choices.invalidate()
+    invalidate_pages(pages)
+  except:
+    db.session.rollback()
+    error = True
+  finally:
+    db.session.close()
+  # TODO: take values from the form submitted, and update existing
+  # venue record with ID <venue_id> using the new attributes
+  if error:
+    flash('Venue {} could not be edited!'.format(venue_id))
+  else:
+    flash('Venue {} was successfully edited'.format(venue_id))
+  return redirect(url_for('.show_venue', venue_id=venue_id))
+
+#  Create Artist
+#  ----------------------------------------------------------------
+
+@bp.route('/artists/create', methods=['GET'])
+def create_artist_form():
+  from forms import ArtistForm
+  form = ArtistForm()
+  return render_template('forms/new_artist.html', form=form)
+
+@bp.route('/artists/create', methods=['POST'])
+def create_artist_submission():
+  artist = Artist()
+  error = False
+  artist.name = request.form.get('name')
+  artist.genres = Genre.lookup(request.form.getlist("genres"))
+  artist.city = request.form.get("city")
+  artist.state = request.form.get("state")
+  artist.phone = request.form.get("phone")
+  artist.website = request.form.get("website")
+  artist.facebook_link = request.form.get("facebook_link")
+  artist.seeking_venue = (request.form.get("seeking_venue")=='y')
+  artist.seeking_description = request.form.get("seeking_description")
+  artist.image_link = request.form.get("image_link")
+  
+  try:
+    db.session.add(artist)
+    db.session.commit()
+    artist_search.invalidate()
+    artist_choices.invalidate()
+    page_cache.invalidate('artists')
+  except:
+    error = True
+    db.session.rollback()
+  finally:
+    db.session.close()
+  if error:
+    flash('Artist {} could not be listed'.format(artist.name))
+  else:
+  # called upon submitting the new artist listing form
+  # TODO: insert form data as a new Venue record in the db, instead
+  # TODO: modify data to be the data object returned from db insertion
+
+  # on successful db insert, flash success
+    flash('Artist ' + request.form['name'] + ' was successfully listed!')
+  # TODO: on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Artist ' + data.name + ' could not be listed.')
+  return render_template('pages/home.html')
+
+
+#  Genres
+#  ----------------------------------------------------------------
+
+def filter_by_genre(model, association, genre):
+  """
+    Returns (id, name, city, state) of all venues or artists with the given genre,
+    optionally narrowed by the query parameters state and city, in one indexed join
+  """
+  key = association.c.venue_id if model is Venue else association.c.artist_id
+  query = db.session.query(model.id, model.name, model.city, model.state
+    ).join(association, key == model.id
+    ).join(Genre, Genre.id == association.c.genre_id
+    ).filter(Genre.name == genre)
+  if request.args.get('state'):
+    query = query.filter(model.state == request.args.get('state'))
+  if request.args.get('city'):
+    query = query.filter(model.city == request.args.get('city'))
+  return query.order_by(model.name, model.id).all()
+
+@bp.route('/genres/<genre>/venues')
+def venues_by_genre(genre):
+  venues = filter_by_genre(Venue, venue_genres, genre)
+  return jsonify({
+    'genre': genre,
+    'count': len(venues),
+    'data': [{'id': venue_id, 'name': name, 'city': city, 'state': state}
+             for venue_id, name, city, state in venues]
+  })
+
+@bp.route('/genres/<genre>/artists')
+def artists_by_genre(genre):
+  artists = filter_by_genre(Artist, artist_genres, genre)
+  return jsonify({
+    'genre': genre,
+    'count': len(artists),
+    'data': [{'id': artist_id, 'name': name, 'city': city, 'state': state}
+             for artist_id, name, city, state in artists]
+  })
+
+
+#  Shows
+#  ----------------------------------------------------------------
+
+@bp.route('/shows')
+@page_cache.cached(lambda: 'shows:{}'.format(request.args.get('after', '')),
+                   unless=lambda: request.args.get('stream', type=int) == 1)
+def shows():
+  # displays list of shows at /shows
+  # keyset pagination on the unique key (start_time, artist_id, venue_id):
+  # ?after=<cursor> continues behind the last show of the previous page,
+  # ?stream=1 streams every show from there on while the template renders
+  after = decode_show_cursor(request.args.get('after'))
+  stream = request.args.get('stream', type=int) == 1
+
+  query = db.session.query(
+      Show.start_time, Show.artist_id, Show.venue_id,
+      Venue.name, Artist.name, Artist.image_link
+    ).join(Venue, Venue.id == Show.venue_id
+    ).join(Artist, Artist.id == Show.artist_id
+    ).order_by(Show.start_time, Show.artist_id, Show.venue_id)
+  if after is not None:
+    query = query.filter(db.tuple_(Show.start_time, Show.artist_id, Show.venue_id) > after)
+
+  if stream:
+    rows = (show_row(row) for row in query.yield_per(current_app.config['SHOWS_PER_PAGE']))
+    return Response(stream_with_context(
+      stream_template('pages/shows.html', shows=rows, next_cursor=None)))
+
+  rows = query.limit(current_app.config['SHOWS_PER_PAGE'] + 1).all()
+  next_cursor = None
+  if len(rows) > current_app.config['SHOWS_PER_PAGE']:
+    rows = rows[:-1]
+    next_cursor = encode_show_cursor(rows[-1])
+  data = [show_row(row) for row in rows]
+  if current_app.logger.isEnabledFor(logging.DEBUG):
+    current_app.logger.debug('shows page after %s: %d shows', request.args.get('after'), len(data), extra={'payload': data})
+
+#  data=[{
+#    "venue_id": 1,
+#    "venue_name": "The Musical Hop",
+#    "artist_id": 4,
+#    "artist_name": "Guns N Petals",
+#    "artist_image_link": "https://images.unsplash.com/photo-1549213783-8284d0336c4f?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=300&q=80",
+#    "start_time": "2019-05-21T21:30:00.000Z"
+#  }, {
+#    "venue_id": 3,
+#    "venue_name": "Park Square Live Music & Coffee",
+#    "artist_id": 5,
+#    "artist_name": "Matt Quevedo",
+#    "artist_image_link": "https://images.unsplash.com/photo-1495223153807-b916f75de8c5?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=334&q=80",
+#    "start_time": "2019-06-15T23:00:00.000Z"
+#  }, {
+#    "venue_id": 3,
+#    "venue_name": "Park Square Live Music & Coffee",
+#    "artist_id": 6,
+#    "artist_name": "The Wild Sax Band",
+#    "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#    "start_time": "2035-04-01T20:00:00.000Z"
+#  }, {
+#    "venue_id": 3,
+#    "venue_name": "Park Square Live Music & Coffee",
+#    "artist_id": 6,
+#    "artist_name": "The Wild Sax Band",
+#    "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#    "start_time": "2035-04-08T20:00:00.000Z"
+#  }, {
+#    "venue_id": 3,
+#    "venue_name": "Park Square Live Music & Coffee",
+#    "artist_id": 6,
+#    "artist_name": "The Wild Sax Band",
+#    "artist_image_link": "https://images.unsplash.com/photo-1558369981-f9ca78462e61?ixlib=rb-1.2.1&ixid=eyJhcHBfaWQiOjEyMDd9&auto=format&fit=crop&w=794&q=80",
+#    "start_time": "2035-04-15T20:00:00.000Z"
+#  }]
+  return render_template('pages/shows.html', shows=data, next_cursor=next_cursor)
+
+@bp.route('/shows/create')
+def create_shows():
+  # renders form. do not touch.
+  from forms import ShowForm
+  form = ShowForm()
+  # catalogs too large for a select box are picked through the autocomplete endpoints
+  limit, ttl = current_app.config['SHOW_FORM_MAX_CHOICES'], current_app.config['CHOICES_TTL']
+  artists = artist_choices.choices(limit, ttl)
+  venues = venue_choices.choices(limit, ttl)
+  form.artist_id.choices = artists or []
+  form.venue_id.choices = venues or []
+  return render_template('forms/new_show.html', form=form,
+                         artist_autocomplete=url_for('.autocomplete_artists') if artists is None else None,
+                         venue_autocomplete=url_for('.autocomplete_venues') if venues is None else None)
+
+@bp.route('/artists/autocomplete')
+def autocomplete_artists():
+  return autocomplete(artist_search)
+
+@bp.route('/venues/autocomplete')
+def autocomplete_venues():
+  return autocomplete(venue_search)
+
+@bp.route('/shows/create', methods=['POST'])
+def create_show_submission():
+  # called to create new shows in the db, upon submitting new show listing form
+  # TODO: insert form data as a new Show record in the db, instead
+  error=False
+  conflicts=[]
+  try:
+    row = {key: request.form.get(key) for key in ('artist_id', 'venue_id', 'start_time')}
+    result, = book_shows([row])
+    current_app.logger.debug('new show %r: %r', row, result)
+    error = result['status'] != 'created'
+    conflicts = result.get('conflicts', [])
+  except:
+    db.session.rollback()
+    error=True
+  finally:
+    db.session.close()
+  if not error:  
+  # on successful db insert, flash success
+    flash('Show was successfully listed!')
+  elif conflicts:
+    flash('Show could not be listed: the {} is already booked for a show at {}.'.format(
+      conflicts[0]['reason'], conflicts[0]['start_time'].replace('T', ' ')))
+  else:
+    flash('Show could not be listed!')
+  # TODO: on unsuccessful db insert, flash an error instead.
+  # e.g., flash('An error occurred. Show could not be listed.')
+  # see: http://flask.pocoo.org/docs/1.0/patterns/flashing/
+  return render_template('pages/home.html')
+
+@bp.route('/shows/batch', methods=['POST'])
+def create_show_batch():
+  """
+    Books many shows in one request, e.g. the tour of an artist. The body is a JSON
+    list of shows ({artist_id, venue_id, start_time}) or an object with that list
+    as "shows", optional artist_id / venue_id defaults for its rows and "atomic".
+    Responds with one result per row (see book_shows), 201 if all were created.
+  """
+  body = request.get_json(silent=True)
+  if isinstance(body, list):
+    body = {'shows': body}
+  if not isinstance(body, dict) or not isinstance(body.get('shows'), list) \
+      or not all(isinstance(row, dict) for row in body['shows']):
+    return jsonify({'success': False, 'message': 'expected a JSON list of shows'}), 400
+  if len(body['shows']) > current_app.config['SHOW_BATCH_MAX_ROWS']:
+    return jsonify({'success': False, 'message': 'at most {} shows per batch'.format(
+      current_app.config['SHOW_BATCH_MAX_ROWS'])}), 413
+
+  defaults = {key: body[key] for key in ('artist_id', 'venue_id') if key in body}
+  atomic = bool(body.get('atomic'))
+  try:
+    results = book_shows([dict(defaults, **row) for row in body['shows']], atomic)
+  except:
+    db.session.rollback()
+    current_app.logger.exception('show batch failed')
+    return jsonify({'success': False, 'message': 'the shows could not be booked'}), 500
+  finally:
+    db.session.close()
+
+  created = sum(1 for result in results if result['status'] == 'created')
+  status = 201 if created == len(results) else 409 if atomic else 200
+  return jsonify({'success': created == len(results), 'created': created, 'results': results}), status
+
+@bp.app_errorhandler(404)
+def not_found_error(error):
+    return render_template('errors/404.html'), 404
+
+@bp.app_errorhandler(500)
+def server_error(error):
+    return render_template('errors/500.html'), 500
+
@@ -0,0 +1,92 @@
+"""
+Benchmark of the question list pagination at a million questions.
+
+Seeds --questions questions into DATABASE_URL (a SQLite file by default, pass
+a scratch PostgreSQL database to measure the real thing) and compares, per
+page request, the former approach (load all questions, slice in Python)
+with the SQL pagination of flaskr.pagination: the first page, a deep page
+by OFFSET, the same page by cursor and a category page.
+
+  $ python benchmarks/bench_pagination.py --questions 1000000
+  $ DATABASE_URL=postgresql://localhost/trivia_bench python benchmarks/bench_pagination.py
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'trivia_bench.db'))
+
+from flaskr import create_app
+from flaskr.pagination import QUESTIONS_PER_PAGE, encode_cursor
+from models import db, Question, Category
+
+CATEGORIES = ['Science', 'Art', 'Geography', 'History', 'Entertainment', 'Sports']
+
+
+def seed(questions, batch_size=50000):
+  """
+    Fills the questions table up to the given number of questions
+  """
+  if not Category.query.count():
+    db.session.execute(Category.__table__.insert(), [{'type': name} for name in CATEGORIES])
+  count = Question.query.count()
+  while count < questions:
+    rows = [{
+      'question': 'Question {} about {}'.format(i, CATEGORIES[i % 6]),
+      'answer': 'Answer {}'.format(i),
+      'category': str(1 + i % 6),
+      'difficulty': 1 + i % 5,
+    } for i in range(count, min(count + batch_size, questions))]
+    db.session.execute(Question.__table__.insert(), rows)
+    count += len(rows)
+  db.session.commit()
+
+
+def timed(function, repeat):
+  started = time.perf_counter()
+  for _ in range(repeat):
+    function()
+  return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--questions', type=int, default=1000000)
+  parser.add_argument('--repeat', type=int, default=20)
+  parser.add_argument('--old-repeat', type=int, default=2, help='repetitions of the (slow) former approach')
+  args = parser.parse_args()
+
+  app = create_app()
+  client = app.test_client()
+  with app.app_context():
+    seed(args.questions)
+    total = Question.query.count()
+    deep_page = total // QUESTIONS_PER_PAGE // 2
+    deep_id = Question.query.order_by(Question.id).offset((deep_page - 1) * QUESTIONS_PER_PAGE).limit(1).one().id - 1
+
+    def old_page(page, query=Question.query):
+      questions = query.order_by(Question.id).all()
+      start = (page - 1) * QUESTIONS_PER_PAGE
+      return [q.format() for q in questions[start:start + QUESTIONS_PER_PAGE]], len(questions)
+
+    cases = [
+      ('first page', lambda: old_page(1), '/questions'),
+      ('page {}'.format(deep_page), lambda: old_page(deep_page), '/questions?page={}'.format(deep_page)),
+      ('cursor, same page', None, '/questions?cursor={}'.format(encode_cursor(deep_id))),
+      ('category 2', lambda: old_page(1, Question.query.filter(Question.category == 2)), '/categories/2/questions'),
+    ]
+    print('{} questions, {}'.format(total, db.engine.url.drivername))
+    print('{:<20} {:>12} {:>12}'.format('request', 'former ms', 'sql ms'))
+    for name, old, path in cases:
+      former = timed(old, args.old_repeat) if old else float('nan')
+      current = timed(lambda: client.get(path), args.repeat)
+      print('{:<20} {:>12.1f} {:>12.2f}'.format(name, former, current))
+
+
+if __name__ == '__main__':
+  main()
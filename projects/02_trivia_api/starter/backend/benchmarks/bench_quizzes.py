@@ -0,0 +1,62 @@
+"""
+Benchmark of a quiz step at a million questions.
+
+Seeds the database like bench_pagination.py and times POST /quizzes for
+"All" and one category, once with the former approach (load every candidate
+row, random.choice), once with the cached id sampling and once as a step of
+a quiz session (one primary key fetch).
+
+  $ python benchmarks/bench_quizzes.py --questions 1000000
+"""
+
+import argparse
+import random
+import time
+
+from bench_pagination import seed
+from flaskr import create_app
+from models import Question
+
+
+def timed(function, repeat):
+  started = time.perf_counter()
+  for _ in range(repeat):
+    function()
+  return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--questions', type=int, default=1000000)
+  parser.add_argument('--previous', type=int, default=4, help='questions already asked in the quiz')
+  parser.add_argument('--repeat', type=int, default=50)
+  parser.add_argument('--old-repeat', type=int, default=2, help='repetitions of the (slow) former approach')
+  args = parser.parse_args()
+
+  app = create_app()
+  client = app.test_client()
+  with app.app_context():
+    seed(args.questions)
+    previous = [q.id for q in Question.query.limit(args.previous)]
+
+    def former(category):
+      query = Question.query.filter(Question.id.notin_(previous))
+      if category:
+        query = query.filter(Question.category == category)
+      return random.choice(query.all()).format()
+
+    print('{:<10} {:>12} {:>12} {:>12}'.format('category', 'former ms', 'sampled ms', 'session ms'))
+    for category in (0, 2):
+      body = {'previous_questions': previous, 'quiz_category': {'id': category}}
+      client.post('/quizzes', json=body)  # loads the id array
+      session = client.post('/quizzes/sessions', json={'quiz_category': {'id': category}, 'length': args.repeat})
+      session_id = session.json['session_id']
+      print('{:<10} {:>12.1f} {:>12.2f} {:>12.2f}'.format(
+        category or 'all',
+        timed(lambda: former(category), args.old_repeat),
+        timed(lambda: client.post('/quizzes', json=body), args.repeat),
+        timed(lambda: client.post('/quizzes', json={'session_id': session_id}), args.repeat)))
+
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,60 @@
+"""
+Benchmark of the question search at a million questions.
+
+Seeds the database like bench_pagination.py and times a search page, once
+with the former approach (ILIKE '%term%' on question and answer, a sequential
+scan, plus a count) and once with POST /questions of flaskr.search, for a
+frequent and a rare term. Without PostgreSQL the first search builds the
+in-process index, its time is printed separately.
+
+  $ DATABASE_URL=postgresql://localhost/trivia_bench python benchmarks/bench_search.py
+"""
+
+import argparse
+import time
+
+from sqlalchemy import or_
+
+from bench_pagination import seed
+from flaskr import create_app
+from flaskr.pagination import QUESTIONS_PER_PAGE
+from models import db, Question
+
+
+def timed(function, repeat):
+  started = time.perf_counter()
+  for _ in range(repeat):
+    function()
+  return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument('--questions', type=int, default=1000000)
+  parser.add_argument('--repeat', type=int, default=20)
+  parser.add_argument('--old-repeat', type=int, default=2, help='repetitions of the (slow) former approach')
+  args = parser.parse_args()
+
+  app = create_app()
+  client = app.test_client()
+  with app.app_context():
+    seed(args.questions)
+
+    def former(term):
+      query = Question.query.filter(or_(Question.answer.ilike('%{}%'.format(term)), Question.question.ilike('%{}%'.format(term))))
+      return [q.format() for q in query.order_by(Question.id).limit(QUESTIONS_PER_PAGE)], query.count()
+
+    def search(term):
+      response = client.post('/questions', json={'searchTerm': term})
+      assert response.status_code == 200, response.status_code
+
+    print('{} questions, {}'.format(Question.query.count(), db.engine.dialect.name))
+    print('first search (builds the index without PostgreSQL): {:.1f} ms'.format(timed(lambda: search('science'), 1)))
+    print('{:<16} {:>12} {:>12}'.format('term', 'former ms', 'search ms'))
+    for term in ('science', 'question {}'.format(args.questions // 2)):
+      print('{:<16} {:>12.1f} {:>12.2f}'.format(
+        term, timed(lambda: former(term), args.old_repeat), timed(lambda: search(term), args.repeat)))
+
+
+if __name__ == '__main__':
+  main()
@@ -1,33 +1,52 @@
 import os
+import click
 from flask import Flask, request, abort, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import or_, and_
 from flask_cors import CORS
-import random
+from sqlalchemy.exc import SQLAlchemyError
 
-from models import setup_db, Question, Category
-
-QUESTIONS_PER_PAGE = 10
-
-def paginate_results(selection,request):
-  """
-    Helper function supplies pagination of questions:
-    - selection: list of questions
-    - request: flask request including query parameter 'page' as int
-  """
-  page = request.args.get('page',1,int)
-  start = (page - 1) * QUESTIONS_PER_PAGE
-  end = min(len(selection),start + QUESTIONS_PER_PAGE)
-  return selection[start:end]
+from models import setup_db, Question
+from .categories import CategoryCache
+from .ingest import insert_questions, delete_questions
+from .pagination import paginate_query, CountCache
+from .sampling import QuestionSampler, QuizSessions
+from .search import QuestionSearch
 
 
 
 def create_app(test_config=None):
   # create and configure the app
   app = Flask(__name__)
+  if test_config is not None:
+    app.config.update(test_config)
   setup_db(app)
 
   CORS(app, origins='*')
+
+  # totals of the paginated lists, dropped on insert and delete
+  question_counts = CountCache(ttl=app.config.get('TOTAL_QUESTIONS_TTL', 60))
+  # full text search, its in-process index (without PostgreSQL) is dropped on insert and delete
+  question_search = QuestionSearch(question_counts, ttl=app.config.get('SEARCH_INDEX_TTL', 60))
+  # question ids per category for the quizzes, dropped on insert and delete
+  question_sampler = QuestionSampler(ttl=app.config.get('QUIZ_IDS_TTL', 60))
+  quiz_sessions = QuizSessions(question_sampler, ttl=app.config.get('QUIZ_SESSION_TTL', 3600))
+
+  def questions_changed():
+    """
+    Drops what this process cached about the questions, after they were inserted or deleted
+    """
+    question_counts.invalidate()
+    question_sampler.invalidate()
+    question_search.invalidate()
+
+  # categories are read once per process, with CATEGORY_CACHE_REDIS_URL
+  # an invalidation reaches all processes
+  redis_url = app.config.get('CATEGORY_CACHE_REDIS_URL', os.environ.get('CATEGORY_CACHE_REDIS_URL'))
+  if redis_url:
+    import redis
+    category_cache = CategoryCache(ttl=app.config.get('CATEGORY_CACHE_TTL', 300), client=redis.Redis.from_url(redis_url))
+  else:
+    category_cache = CategoryCache(ttl=app.config.get('CATEGORY_CACHE_TTL', 300))
   
   '''
   @TODO: Set up CORS. Allow '*' for origins. Delete the sample route after completing the TODOs
@@ -37,7 +56,7 @@ def create_app(test_config=None):
     """
     Sets up CORS headers for all requests
     """  
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,true')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,If-None-Match,true')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
 
     return response
@@ -48,14 +67,44 @@ def create_app(test_config=None):
   @app.route('/categories')
   def get_categories():
     """
-    Returns all available categories as a dictionary with keys as category id and values the corresponding category type 
+    Returns all available categories as a dictionary with keys as category id and values the corresponding category type,
+    from the category cache with an ETag: a request with a matching If-None-Match gets an empty 304 response
     """
-    cats = Category.query.all()
-    resp = {
-      'success' : True,
-      'categories' : {cat.id: cat.type for cat in cats}
-    }
-    return jsonify(resp)
+    categories, etag = category_cache.get()
+    if request.if_none_match.contains(etag):
+      response = app.response_class(status=304)
+    else:
+      response = jsonify({
+        'success' : True,
+        'categories' : categories
+      })
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+  @app.cli.command('invalidate-categories')
+  def invalidate_categories():
+    """Makes the app read the categories again, in all processes if CATEGORY_CACHE_REDIS_URL is set."""
+    category_cache.invalidate()
+
+  @app.cli.command('import-questions')
+  @click.argument('lines', type=click.File('rb'))
+  @click.option('--chunk-size', default=1000, show_default=True, help='Questions inserted per statement and commit.')
+  def import_questions(lines, chunk_size):
+    """Imports the questions of a JSON lines file ('-' for stdin), one question object per line."""
+    report = insert_questions(lines, category_cache.categories(), chunk_size)
+    for error in report.errors:
+      click.echo('line {line}: {error}'.format(**error), err=True)
+    click.echo('{} questions imported, {} failed'.format(report.done, report.failed))
+
+  @app.cli.command('delete-questions')
+  @click.argument('ids', type=int, nargs=-1, required=True)
+  def delete_questions_command(ids):
+    """Deletes the questions with the given ids."""
+    report, deleted = delete_questions(ids)
+    for error in report.errors:
+      click.echo('id {id}: {error}'.format(**error), err=True)
+    click.echo('{} questions deleted'.format(report.done))
 
   '''
   @TODO: 
@@ -69,17 +118,17 @@ def create_app(test_config=None):
     Returns all available questions paginated as 10 questions 
     """
     
-    all_questions = Question.query.order_by(Question.id).all()
-    current_questions = paginate_results(all_questions,request)
+    current_questions, next_cursor = paginate_query(Question.query,request)
     if len(current_questions) == 0:
       abort(404)
 
     resp= {
       'success': True,
       'questions': [q.format() for q in current_questions],
-      'total_questions': len(all_questions),
-      'categories': {cat.id: cat.type for cat in Category.query.all()},
-      'current_category': None
+      'total_questions': question_counts.count('all', Question.query),
+      'categories': category_cache.categories(),
+      'current_category': None,
+      'next_cursor': next_cursor
     }
     return jsonify(resp)
   '''
@@ -108,6 +157,7 @@ def create_app(test_config=None):
     else:
       try:
         question.delete()
+        questions_changed()
         response = {
           'success':True,
           'deleted':question.id}
@@ -125,7 +175,8 @@ def create_app(test_config=None):
   def create_or_search_question():
     """
      creates a new question (with attributes question, answer, difficulty and category) 
-     or searches for questions with searchTerm in question or answer
+     or searches for questions with words starting with the words of searchTerm in question or answer,
+     most relevant first and with the matched words highlighted
     """
 
     data = request.json
@@ -136,15 +187,15 @@ def create_app(test_config=None):
     search = data.get('searchTerm')
 
     if search is not None:
-      all_questions = Question.query.order_by(Question.id).filter(or_(Question.answer.ilike('%{}%'.format(search)),Question.question.ilike('%{}%'.format(search)))).all()
-      current_questions = paginate_results(all_questions,request)
+      results, total, next_cursor = question_search.search(search, request)
 
       response= {
         'success': True,
-        'questions': [q.format() for q in current_questions],
-        'total_questions': len(all_questions),
-        'categories': {cat.id: cat.type for cat in Category.query.all()},
-        'current_category': None
+        'questions': [dict(q.format(), highlight={'question': question, 'answer': answer}) for q, question, answer in results],
+        'total_questions': total,
+        'categories': category_cache.categories(),
+        'current_category': None,
+        'next_cursor': next_cursor
       }
  
 
@@ -155,6 +206,7 @@ def create_app(test_config=None):
 
       try:
         question.insert()
+        questions_changed()
         response = {
           'success': True,
           'created': question.id
@@ -163,6 +215,52 @@ def create_app(test_config=None):
         abort(422)
     return jsonify(response)
 
+  @app.route('/questions/batch',methods=["POST"])
+  def create_question_batch():
+    """
+    Creates the questions of a JSON lines body (one question object per line), read and validated
+    line by line and inserted with one statement per QUESTIONS_BATCH_CHUNK_SIZE questions.
+    Invalid lines are reported in errors and skipped, the valid ones are created.
+    """
+
+    report = insert_questions(request.stream, category_cache.categories(),
+      app.config.get('QUESTIONS_BATCH_CHUNK_SIZE', 1000))
+    if report.done == 0:
+      abort(422 if report.failed else 400)
+    questions_changed()
+    return jsonify({
+      'success': True,
+      'created': report.done,
+      'failed': report.failed,
+      'errors': report.errors
+    })
+
+  @app.route('/questions',methods=["DELETE"])
+  def delete_question_batch():
+    """
+    Deletes the questions with the ids of the list ids in one transaction,
+    ids of questions that do not exist are reported in errors, 404 if none exists
+    """
+
+    ids = (request.get_json(silent=True) or {}).get('ids')
+    if not ids or not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+      abort(400)
+    if len(ids) > app.config.get('QUESTIONS_BATCH_MAX_IDS', 10000):
+      abort(413)
+    try:
+      report, deleted = delete_questions(ids)
+    except SQLAlchemyError:
+      abort(422)
+    if not deleted:
+      abort(404)
+    questions_changed()
+    return jsonify({
+      'success': True,
+      'deleted': deleted,
+      'failed': report.failed,
+      'errors': report.errors
+    })
+
   '''
   @TODO: 
   Create an endpoint to POST a new question, 
@@ -193,17 +291,18 @@ def create_app(test_config=None):
     Returns all available questions of a category identified by id cat_id, paginated by 10 questions 
     """
 
-    all_questions = Question.query.order_by(Question.id).filter(Question.category==cat_id).all()
-    current_questions = paginate_results(all_questions,request)
+    query = Question.query.filter(Question.category==cat_id)
+    current_questions, next_cursor = paginate_query(query,request)
     if len(current_questions) == 0:
       abort(404)
 
     resp= {
       'success': True,
       'questions': [q.format() for q in current_questions],
-      'total_questions': len(all_questions),
-      'categories': {cat.id: cat.type for cat in Category.query.all()},
-      'current_category': cat_id
+      'total_questions': question_counts.count(('category', cat_id), query),
+      'categories': category_cache.categories(),
+      'current_category': cat_id,
+      'next_cursor': next_cursor
     }
     return jsonify(resp)
 
@@ -232,43 +331,58 @@ def create_app(test_config=None):
   def get_quiz_question():
     """
     Returns the next random question of a quiz from a specific category (defined by dict quiz_category) 
-    that was not posed in this quiz before (defined by list previous_questions)  
+    that was not posed in this quiz before (defined by list previous_questions),
+    or the next question of a quiz session (defined by session_id, see start_quiz_session)
     """
 
     data = request.json
+    session_id = data.get('session_id')
     prev_questions = data.get('previous_questions')
     category = data.get('quiz_category')
-    if prev_questions is None or category is None:
+    if session_id is not None:
+      try:
+        question = quiz_sessions.next(session_id)
+      except KeyError:
+        abort(404)
+    elif prev_questions is None or category is None:
       abort(400)
     else:
-      cid = category['id']
-      if cid != 0 and len(prev_questions) > 0:
-        questions = Question.query.filter(
-          and_(
-            Question.category==cid,
-            Question.id.notin_(prev_questions)
-          )
-        ).all()
-      elif cid != 0 and len(prev_questions) == 0:
-        questions = Question.query.filter(Question.category==cid).all()
-      elif cid == 0 and len(prev_questions) != 0:
-        questions = Question.query.filter(Question.id.notin_(prev_questions)).all()
-      else:
-        questions = Question.query.all()
-      random.seed()
-      if len(questions) > 0:
-        question = random.choice(questions)
-        response = {
-        'success': True,
-        'question': question.format()
-        }
-      else:
-        response = {
-        'success': True,
-        }
-      
+      question = question_sampler.pick(category['id'], prev_questions)
+
+    if question is not None:
+      response = {
+      'success': True,
+      'question': question.format()
+      }
+    else:
+      response = {
+      'success': True,
+      }
     return jsonify(response)
 
+  @app.route('/quizzes/sessions', methods=["POST"])
+  def start_quiz_session():
+    """
+    Starts a quiz of a category (defined by dict quiz_category) whose question order is shuffled
+    once on the server, so every following POST /quizzes with its session_id fetches one question
+    by id. The optional length (int, default QUIZ_SESSION_LENGTH) limits the number of questions,
+    which keeps starting a quiz of all questions cheap.
+    """
+
+    data = request.json
+    category = data.get('quiz_category')
+    if category is None or category.get('id') is None:
+      abort(400)
+    length = data.get('length', app.config.get('QUIZ_SESSION_LENGTH', 50))
+    if not isinstance(length, int) or length < 1:
+      abort(400)
+    session_id, total = quiz_sessions.start(category['id'], length)
+    return jsonify({
+      'success': True,
+      'session_id': session_id,
+      'total_questions': total
+    })
+
   '''
   @TODO: 
   Create error handlers for all expected errors 
@@ -304,6 +418,7 @@ def create_app(test_config=None):
       'success': False,
       'error': 422,
       'message': 'request not processable'})
+    return response, 422
 
   @app.errorhandler(400)
   def bad_request_400(error):
@@ -316,6 +431,16 @@ def create_app(test_config=None):
                 'message': 'information missing'}), 400
     return response 
 
+  @app.errorhandler(413)
+  def payload_too_large_413(error):
+    """
+    Errorhandler for 413 (payload too large) error, for batches above their limit
+    """
+    response = jsonify({'success': False,
+                'error': 413,
+                'message': 'too many items'}), 413
+    return response 
+
   @app.errorhandler(500)
   def internal_server_error_500(error):
     response = jsonify({'success': False,
@@ -0,0 +1,69 @@
+import hashlib
+import json
+import threading
+import time
+
+from models import Category
+
+
+class CategoryCache(object):
+  """
+    The categories as {id: type} and an ETag of them, read from the database once
+    and then kept in the process:
+    - ttl: seconds after which a process reads them again at the latest
+    - client: optional redis client holding a version number of the categories,
+      shared by all processes; invalidate() increments it and every process reads
+      the categories again when it sees a new version, which it checks at most
+      every check_interval seconds
+    Without a client invalidate() only reaches the calling process.
+  """
+
+  def __init__(self, ttl=300, client=None, check_interval=1.0, key='trivia:categories:version'):
+    self.ttl = ttl
+    self.client = client
+    self.check_interval = check_interval
+    self.key = key
+    self.version = 0
+    self._categories = None
+    self._etag = None
+    self._expires = 0.0
+    self._checked = 0.0
+    self._lock = threading.Lock()
+
+  def _shared_version(self):
+    version = self.client.get(self.key)
+    return int(version) if version is not None else 0
+
+  def get(self):
+    """
+      Returns the categories and their ETag
+    """
+    now = time.monotonic()
+    with self._lock:
+      current = self._categories is not None and self._expires > now
+      if current and self.client is not None and self._checked <= now:
+        self._checked = now + self.check_interval
+        current = self._shared_version() == self.version
+      if current:
+        return self._categories, self._etag
+
+      version = self._shared_version() if self.client is not None else self.version
+      categories = {category.id: category.type for category in Category.query.order_by(Category.id)}
+      # derived from the content, so all processes send the same ETag for the same categories
+      etag = hashlib.sha1(json.dumps(categories, sort_keys=True).encode('utf-8')).hexdigest()[:20]
+      self._categories, self._etag, self.version = categories, etag, version
+      self._expires = now + self.ttl
+      self._checked = now + self.check_interval
+      return categories, etag
+
+  def categories(self):
+    return self.get()[0]
+
+  def invalidate(self):
+    """
+      Makes every process (with a client) or this process read the categories again
+    """
+    with self._lock:
+      if self.client is not None:
+        self.client.incr(self.key)
+      self._categories = None
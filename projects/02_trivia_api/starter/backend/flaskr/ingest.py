@@ -0,0 +1,138 @@
+import json
+
+from models import db, Question
+
+# errors listed in a report, the rest is only counted
+MAX_REPORTED_ERRORS = 1000
+# ids per DELETE ... WHERE id IN (...), below the parameter limit of SQLite
+DELETE_CHUNK_SIZE = 500
+
+
+def validate_question(item, categories):
+  """
+    Returns the row of a question to insert and None, or None and the error
+    of an invalid one; categories holds the valid category ids
+  """
+  if not isinstance(item, dict):
+    return None, 'not an object'
+  for field in ('question', 'answer'):
+    if not isinstance(item.get(field), str) or not item[field].strip():
+      return None, '{} missing'.format(field)
+  difficulty = item.get('difficulty')
+  if not isinstance(difficulty, int) or isinstance(difficulty, bool) or not 1 <= difficulty <= 5:
+    return None, 'difficulty must be an integer from 1 to 5'
+  try:
+    category = int(item.get('category'))
+  except (TypeError, ValueError):
+    category = None
+  if category not in categories:
+    return None, 'unknown category'
+  return {
+    'question': item['question'],
+    'answer': item['answer'],
+    'category': str(category),
+    'difficulty': difficulty,
+  }, None
+
+
+class Report(object):
+  """
+    The outcome of a batch: the number of questions created or deleted and the
+    errors of the items that failed, as {'line' or 'id': ..., 'error': ...}
+  """
+
+  def __init__(self):
+    self.done = 0
+    self.failed = 0
+    self.errors = []
+
+  def error(self, key, value, message):
+    self.failed += 1
+    if len(self.errors) < MAX_REPORTED_ERRORS:
+      self.errors.append({key: value, 'error': message})
+
+
+def insert_questions(lines, categories, chunk_size=1000):
+  """
+    Inserts the questions of JSON lines (an iterable of str or bytes, one question
+    object per line, blank lines are skipped), validating them one by one while
+    reading. The valid ones are inserted with one statement and committed per
+    chunk of chunk_size questions; a chunk the database rejects is retried in
+    halves down to single rows, so that only the rejected lines are reported
+    and the import goes on. Returns a Report.
+  """
+  report = Report()
+  rows, numbers = [], []
+
+  def insert(rows, numbers):
+    try:
+      db.session.execute(Question.__table__.insert(), rows)
+      db.session.commit()
+      report.done += len(rows)
+    except Exception as error:
+      db.session.rollback()
+      if len(rows) == 1:
+        report.error('line', numbers[0], 'not inserted: {}'.format(type(error).__name__))
+        return
+      half = len(rows) // 2
+      insert(rows[:half], numbers[:half])
+      insert(rows[half:], numbers[half:])
+
+  def flush():
+    insert(rows, numbers)
+    del rows[:], numbers[:]
+
+  for number, line in enumerate(lines, 1):
+    if not line.strip():
+      continue
+    try:
+      item = json.loads(line)
+    except ValueError:
+      report.error('line', number, 'invalid JSON')
+      continue
+    row, error = validate_question(item, categories)
+    if error is not None:
+      report.error('line', number, error)
+      continue
+    rows.append(row)
+    numbers.append(number)
+    if len(rows) >= chunk_size:
+      flush()
+  if rows:
+    flush()
+  return report
+
+
+def delete_questions(ids):
+  """
+    Deletes the questions with the given ids in one transaction, with one
+    DELETE ... WHERE id IN (...) per DELETE_CHUNK_SIZE ids. PostgreSQL returns
+    the deleted ids with RETURNING, other databases (SQLite test runs) select
+    them first. Returns a Report, whose errors are the ids that did not exist,
+    and the list of deleted ids.
+  """
+  report = Report()
+  ids = list(dict.fromkeys(ids))
+  deleted = []
+  returning = db.engine.dialect.name == 'postgresql'
+  try:
+    for start in range(0, len(ids), DELETE_CHUNK_SIZE):
+      chunk = ids[start:start + DELETE_CHUNK_SIZE]
+      delete = Question.__table__.delete().where(Question.id.in_(chunk))
+      if returning:
+        existing = {question_id for (question_id,) in db.session.execute(delete.returning(Question.id))}
+      else:
+        existing = {question_id for (question_id,) in db.session.query(Question.id).filter(Question.id.in_(chunk))}
+        if existing:
+          db.session.execute(delete)
+      for question_id in chunk:
+        if question_id in existing:
+          deleted.append(question_id)
+        else:
+          report.error('id', question_id, 'not found')
+    db.session.commit()
+  except Exception:
+    db.session.rollback()
+    raise
+  report.done = len(deleted)
+  return report, deleted
@@ -0,0 +1,100 @@
+import base64
+import threading
+import time
+
+from flask import abort
+from sqlalchemy import func
+
+from models import Question
+
+QUESTIONS_PER_PAGE = 10
+
+
+def encode_cursor(question_id, kind='q'):
+  """
+    Returns the opaque cursor continuing behind the question with id question_id
+    (kind 'q'), or at a page number of a list not ordered by id (kind 'p')
+  """
+  return base64.urlsafe_b64encode('{}{}'.format(kind, question_id).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, kind='q'):
+  """
+    Returns the question id (or page) of a cursor of encode_cursor(), aborts with 400
+    if it is malformed or of another kind
+  """
+  try:
+    value = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    if not value.startswith(kind) or int(value[1:]) < 1:
+      raise ValueError(cursor)
+    return int(value[1:])
+  except ValueError:
+    abort(400)
+
+
+def page_number(request):
+  """
+    Returns the query parameter 'page' (int, default 1), aborts with 404 if it is below 1
+  """
+  page = request.args.get('page', 1, int)
+  if page < 1:
+    abort(404)
+  return page
+
+
+def paginate_query(query, request):
+  """
+    Returns one page of questions of query, read with LIMIT/OFFSET in SQL,
+    and the cursor of the next page (None on the last page):
+    - query: Question query, without order
+    - request: flask request with the query parameter 'page' (int, default 1)
+      or 'cursor' (continues behind the last question of the previous page
+      with WHERE id > ..., which stays fast on deep pages)
+  """
+  query = query.order_by(Question.id)
+  cursor = request.args.get('cursor')
+  if cursor:
+    query = query.filter(Question.id > decode_cursor(cursor))
+  else:
+    query = query.offset((page_number(request) - 1) * QUESTIONS_PER_PAGE)
+  # one question more tells whether there is a next page
+  questions = query.limit(QUESTIONS_PER_PAGE + 1).all()
+  next_cursor = None
+  if len(questions) > QUESTIONS_PER_PAGE:
+    questions = questions[:QUESTIONS_PER_PAGE]
+    next_cursor = encode_cursor(questions[-1].id)
+  return questions, next_cursor
+
+
+class CountCache(object):
+  """
+    Caches the number of questions matching a query for ttl seconds, so that
+    paging through a list counts its questions once instead of on every page.
+    Writes of this process call invalidate(), other processes see them after ttl.
+  """
+
+  def __init__(self, ttl=60, max_entries=256):
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self._counts = {}
+    self._lock = threading.Lock()
+
+  def count(self, key, query):
+    """
+      Returns the number of questions of query, cached under key
+    """
+    now = time.monotonic()
+    with self._lock:
+      entry = self._counts.get(key)
+    if entry is not None and entry[0] > now:
+      return entry[1]
+    total = query.with_entities(func.count(Question.id)).order_by(None).scalar()
+    with self._lock:
+      if len(self._counts) >= self.max_entries:
+        self._counts.clear()
+      self._counts[key] = (now + self.ttl, total)
+    return total
+
+  def invalidate(self):
+    with self._lock:
+      self._counts.clear()
@@ -0,0 +1,133 @@
+import random
+import secrets
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from models import db, Question
+
+# random probes into the id array before falling back to filtering it
+PROBES = 32
+
+
+class QuestionSampler(object):
+  """
+    Picks random quiz questions without loading the candidate rows: the ids of
+    each category (0 for all) are cached as an array for ttl seconds, a random
+    id not asked before is picked from it and only that question is fetched.
+    Writes of this process call invalidate(), other processes see them after ttl.
+  """
+
+  def __init__(self, ttl=60):
+    self.ttl = ttl
+    self._ids = {}
+    self._lock = threading.Lock()
+
+  def ids(self, category):
+    """
+      Returns the array of question ids of a category, 0 for all categories
+    """
+    now = time.monotonic()
+    with self._lock:
+      entry = self._ids.get(category)
+    if entry is not None and entry[0] > now:
+      return entry[1]
+    query = db.session.query(Question.id)
+    if category != 0:
+      query = query.filter(Question.category == category)
+    ids = array('q', (question_id for (question_id,) in query))
+    with self._lock:
+      self._ids[category] = (now + self.ttl, ids)
+    return ids
+
+  def sample(self, ids, excluded):
+    """
+      Returns a random id of ids that is not in the set excluded, None if there is none
+    """
+    if not ids:
+      return None
+    # random probing takes len(ids) / (len(ids) - len(excluded)) tries on average,
+    # nearly exhausted lists are filtered instead
+    if len(excluded) < len(ids) // 2:
+      for _ in range(PROBES):
+        candidate = random.choice(ids)
+        if candidate not in excluded:
+          return candidate
+    remaining = [question_id for question_id in ids if question_id not in excluded]
+    return random.choice(remaining) if remaining else None
+
+  def pick(self, category, previous):
+    """
+      Returns a random question of a category (0 for all) whose id is not in previous,
+      None if every question was asked
+    """
+    excluded = set(previous)
+    # a second round after reloading ids that went stale (a question deleted by another process)
+    for _ in range(2):
+      question_id = self.sample(self.ids(category), excluded)
+      if question_id is None:
+        return None
+      question = Question.query.get(question_id)
+      if question is not None:
+        return question
+      self.invalidate()
+    return None
+
+  def invalidate(self):
+    with self._lock:
+      self._ids.clear()
+
+
+class QuizSessions(object):
+  """
+    Quizzes whose question order is shuffled once, when they start, and kept
+    in this process: every step is then a single primary key fetch. Sessions
+    expire ttl seconds after their last step, at most max_sessions are kept
+    (the least recently used one is dropped first).
+  """
+
+  def __init__(self, sampler, ttl=3600, max_sessions=10000):
+    self.sampler = sampler
+    self.ttl = ttl
+    self.max_sessions = max_sessions
+    self._sessions = OrderedDict()
+    self._lock = threading.Lock()
+
+  def start(self, category, length):
+    """
+      Starts a quiz of at most length questions of a category (0 for all),
+      returns its session id and number of questions
+    """
+    ids = self.sampler.ids(category)
+    # sampling positions costs O(length), not O(number of questions)
+    order = [ids[position] for position in random.sample(range(len(ids)), min(length, len(ids)))]
+    session_id = secrets.token_urlsafe(16)
+    with self._lock:
+      self._sessions[session_id] = (time.monotonic() + self.ttl, order)
+      while len(self._sessions) > self.max_sessions:
+        self._sessions.popitem(last=False)
+    return session_id, len(order)
+
+  def next(self, session_id):
+    """
+      Returns the next question of a session, None when the quiz is over;
+      raises KeyError for unknown or expired sessions
+    """
+    now = time.monotonic()
+    with self._lock:
+      expires, order = self._sessions[session_id]
+      if expires < now:
+        del self._sessions[session_id]
+        raise KeyError(session_id)
+      self._sessions[session_id] = (now + self.ttl, order)
+      self._sessions.move_to_end(session_id)
+    while True:
+      with self._lock:
+        if not order:
+          return None
+        question_id = order.pop()  # the order is random, so taking from the end is fine
+      # questions deleted since the quiz started are skipped
+      question = Question.query.get(question_id)
+      if question is not None:
+        return question
@@ -0,0 +1,178 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from markupsafe import escape
+from sqlalchemy import func, literal_column
+
+from models import db, Question, SEARCH_DOCUMENT
+from .pagination import QUESTIONS_PER_PAGE, encode_cursor, decode_cursor, page_number, paginate_query
+
+# letters and digits, '_' separates words like the PostgreSQL parser does
+WORD = re.compile(r'[^\W_]+')
+MARK = ('<mark>', '</mark>')
+# ts_headline marks the matches with these private use characters, which survive
+# escaping the headline and are then replaced by MARK
+SENTINELS = ('\ue000', '\ue001')
+HEADLINE_OPTIONS = 'StartSel="{}", StopSel="{}", HighlightAll=true'.format(*SENTINELS)
+# the PostgreSQL text search configuration, 'simple' neither stems words nor drops
+# stop words, like the inverted index
+SEARCH_CONFIG = 'simple'
+
+
+def search_words(term):
+  """
+    Returns the lower case words of a search term
+  """
+  return [word.lower() for word in WORD.findall(term)]
+
+
+def highlight(text, words):
+  """
+    Returns text HTML-escaped, with every word starting with one of words wrapped in <mark></mark>
+  """
+  if text is None:
+    return None
+  if not words:
+    return str(escape(text))
+  pattern = re.compile(r'(?<![^\W_])(?:{})[^\W_]*'.format('|'.join(map(re.escape, words))), re.I)
+  parts, end = [], 0
+  # matches are found in the raw text, so escaping cannot create or split them
+  for match in pattern.finditer(text):
+    parts.append(str(escape(text[end:match.start()])))
+    parts.append(str(escape(match.group(0))).join(MARK))
+    end = match.end()
+  parts.append(str(escape(text[end:])))
+  return ''.join(parts)
+
+
+def headline_markup(headline):
+  """
+    Returns a ts_headline() result HTML-escaped, with its matches wrapped in <mark></mark>
+  """
+  if headline is None:
+    return None
+  return str(escape(headline)).replace(SENTINELS[0], MARK[0]).replace(SENTINELS[1], MARK[1])
+
+
+class InvertedIndex(object):
+  """
+    The words of question and answer of all questions, each mapped to the ids of
+    the questions containing it and how often they do
+  """
+
+  def __init__(self, rows):
+    postings = defaultdict(dict)
+    for question_id, question, answer in rows:
+      for word in search_words('{} {}'.format(question or '', answer or '')):
+        postings[word][question_id] = postings[word].get(question_id, 0) + 1
+    self.postings = dict(postings)
+    self.vocabulary = sorted(self.postings)
+
+  def matches(self, words):
+    """
+      Returns {id: score} of the questions containing a word starting with each of words,
+      the score counts the occurrences of these words
+    """
+    found = None
+    for prefix in words:
+      scores = {}
+      position = bisect_left(self.vocabulary, prefix)
+      while position < len(self.vocabulary) and self.vocabulary[position].startswith(prefix):
+        for question_id, count in self.postings[self.vocabulary[position]].items():
+          scores[question_id] = scores.get(question_id, 0) + count
+        position += 1
+      if found is None:
+        found = scores
+      else:
+        found = {question_id: score + scores[question_id] for question_id, score in found.items() if question_id in scores}
+      if not found:
+        return {}
+    return found or {}
+
+
+class QuestionSearch(object):
+  """
+    Searches the questions whose question or answer contain words starting with
+    the words of a search term, most relevant first, with the matched words
+    highlighted:
+    - PostgreSQL ranks and highlights with full text search (ts_rank, ts_headline)
+      on the GIN index ix_questions_search and reads only the requested page
+    - other databases (SQLite test runs) use an inverted index of all questions
+      kept in the process for ttl seconds; writes of this process call invalidate()
+    - counts: the CountCache of the question totals
+  """
+
+  def __init__(self, counts, ttl=60):
+    self.counts = counts
+    self.ttl = ttl
+    self._index = None
+    self._expires = 0.0
+    self._lock = threading.Lock()
+
+  def search(self, term, request):
+    """
+      Returns one page of results as (question, highlighted question, highlighted answer),
+      the total number of results and the cursor of the next page (None on the last page).
+      request holds the query parameter 'page' or a 'cursor' of a previous page.
+      A term without words finds all questions, in id order.
+    """
+    words = search_words(term)
+    if not words:
+      questions, next_cursor = paginate_query(Question.query, request)
+      total = self.counts.count(('search', ''), Question.query)
+      return [(q, highlight(q.question, words), highlight(q.answer, words)) for q in questions], total, next_cursor
+
+    cursor = request.args.get('cursor')
+    page = decode_cursor(cursor, 'p') if cursor else page_number(request)
+    offset = (page - 1) * QUESTIONS_PER_PAGE
+    if db.engine.dialect.name == 'postgresql':
+      results, total = self._search_postgresql(words, offset)
+    else:
+      results, total = self._search_index(words, offset)
+    next_cursor = None
+    # one result more tells whether there is a next page
+    if len(results) > QUESTIONS_PER_PAGE:
+      results = results[:QUESTIONS_PER_PAGE]
+      next_cursor = encode_cursor(page + 1, 'p')
+    return results, total, next_cursor
+
+  def _search_postgresql(self, words, offset):
+    # only letters and digits reach the query text, ':*' matches the words as prefixes
+    tsquery = func.to_tsquery(literal_column("'{}'".format(SEARCH_CONFIG)), ' & '.join(word + ':*' for word in words))
+    document = literal_column(SEARCH_DOCUMENT)
+    matches = document.op('@@')(tsquery)
+    # ts_headline is costly and only evaluated for the rows of the page
+    results = db.session.query(
+      Question,
+      func.ts_headline(SEARCH_CONFIG, Question.question, tsquery, HEADLINE_OPTIONS),
+      func.ts_headline(SEARCH_CONFIG, Question.answer, tsquery, HEADLINE_OPTIONS),
+    ).filter(matches).order_by(func.ts_rank(document, tsquery).desc(), Question.id) \
+      .offset(offset).limit(QUESTIONS_PER_PAGE + 1).all()
+    total = self.counts.count(('search', ' '.join(words)), Question.query.filter(matches))
+    return [(q, headline_markup(question), headline_markup(answer)) for q, question, answer in results], total
+
+  def index(self):
+    now = time.monotonic()
+    with self._lock:
+      if self._index is not None and self._expires > now:
+        return self._index
+    index = InvertedIndex(db.session.query(Question.id, Question.question, Question.answer))
+    with self._lock:
+      self._index, self._expires = index, now + self.ttl
+    return index
+
+  def _search_index(self, words, offset):
+    scores = self.index().matches(words)
+    ranked = sorted(scores, key=lambda question_id: (-scores[question_id], question_id))
+    page = ranked[offset:offset + QUESTIONS_PER_PAGE + 1]
+    questions = {q.id: q for q in Question.query.filter(Question.id.in_(page))} if page else {}
+    # questions deleted by another process since the index was built are skipped
+    results = [questions[question_id] for question_id in page if question_id in questions]
+    return [(q, highlight(q.question, words), highlight(q.answer, words)) for q in results], len(scores)
+
+  def invalidate(self):
+    with self._lock:
+      self._index = None
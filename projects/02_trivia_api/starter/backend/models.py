@@ -1,10 +1,10 @@
 import os
-from sqlalchemy import Column, String, Integer, create_engine
+from sqlalchemy import Column, String, Integer, Index, DDL, create_engine, event
 from flask_sqlalchemy import SQLAlchemy
 import json
 
 database_name = "trivia"
-database_path = "postgres://{}/{}".format('localhost:5432', database_name)
+database_path = os.environ.get('DATABASE_URL', "postgres://{}/{}".format('localhost:5432', database_name))
 
 db = SQLAlchemy()
 
@@ -25,6 +25,10 @@ Question
 '''
 class Question(db.Model):  
   __tablename__ = 'questions'
+  __table_args__ = (
+    # the questions of a category in id order, for its paginated list
+    Index('ix_questions_category_id', 'category', 'id'),
+  )
 
   id = Column(Integer, primary_key=True)
   question = Column(String)
@@ -58,6 +62,14 @@ class Question(db.Model):
       'difficulty': self.difficulty
     }
 
+# the text searched by flaskr.search, queries have to repeat this expression to use its index
+SEARCH_DOCUMENT = "to_tsvector('simple', coalesce(question, '') || ' ' || coalesce(answer, ''))"
+
+# a GIN index on an expression PostgreSQL only has, so it is created by DDL instead of Index()
+event.listen(Question.__table__, 'after_create', DDL(
+  'CREATE INDEX ix_questions_search ON questions USING gin ({})'.format(SEARCH_DOCUMENT)
+).execute_if(dialect='postgresql'))
+
 '''
 Category
 
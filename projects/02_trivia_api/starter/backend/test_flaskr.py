@@ -1,10 +1,12 @@
 import os
 import unittest
 import json
+from unittest import mock
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 from flaskr import create_app
-from models import setup_db, Question, Category
+from models import setup_db, db, Question, Category
 
 
 class TriviaTestCase(unittest.TestCase):
@@ -41,6 +43,19 @@ class TriviaTestCase(unittest.TestCase):
         dbids = sorted([c.id for c in dbCats])
         self.assertEqual(cids,dbids)
 
+    def test_get_categories_not_modified(self):
+        response = self.client().get('/categories')
+        etag = response.headers.get('ETag')
+        self.assertIsNotNone(etag)
+
+        response = self.client().get('/categories',headers={'If-None-Match':etag})
+        self.assertEqual(response.status_code,304)
+        self.assertEqual(response.data,b'')
+
+        response = self.client().get('/categories',headers={'If-None-Match':'"outdated"'})
+        self.assertEqual(response.status_code,200)
+        self.assertTrue(response.json.get('success'))
+
     def test_get_questions(self):
         response = self.client().get('/questions')
         data = response.json
@@ -66,6 +81,42 @@ class TriviaTestCase(unittest.TestCase):
         self.assertEqual(data.get("error"),404)
         self.assertEqual(data.get("message"),"resource not found")
 
+    def test_get_questions_page_below_one(self):
+        for page in (0, -1):
+            response = self.client().get('/questions?page={}'.format(page))
+            self.assertEqual(response.status_code,404)
+            self.assertFalse(response.json.get('success'))
+            response = self.client().post('/questions?page={}'.format(page),json={'searchTerm':'actor'})
+            self.assertEqual(response.status_code,404)
+
+
+    def test_get_questions_by_cursor(self):
+        response = self.client().get('/questions')
+        data = response.json
+        self.assertEqual(data.get('total_questions'),Question.query.count())
+        cursor = data.get('next_cursor')
+        self.assertIsNotNone(cursor)
+
+        response = self.client().get('/questions?cursor={}'.format(cursor))
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertTrue(data.get('success'))
+        qids = [q["id"] for q in data.get('questions')]
+        self.assertEqual(qids,[q.id for q in Question.query.order_by(Question.id).all()[10:20]])
+        self.assertEqual(data.get('total_questions'),Question.query.count())
+
+    def test_get_questions_last_page_has_no_cursor(self):
+        last_page = (Question.query.count() + 9) // 10
+        response = self.client().get('/questions?page={}'.format(last_page))
+        self.assertEqual(response.status_code,200)
+        self.assertIsNone(response.json.get('next_cursor'))
+
+    def test_get_questions_with_malformed_cursor(self):
+        response = self.client().get('/questions?cursor=not-a-cursor')
+        data = response.json
+        self.assertEqual(response.status_code,400)
+        self.assertFalse(data.get('success'))
+        self.assertEqual(data.get('error'),400)
         
     def test_delete_question(self):
         qid = Question.query.all()[0].id
@@ -103,6 +154,83 @@ class TriviaTestCase(unittest.TestCase):
         self.assertIsNotNone(Question.query.get(int(cid)))
         self.assertEqual(num1+1,len(Question.query.all()))
 
+    def test_create_question_batch(self):
+        lines = [json.dumps({
+            'question': 'Batch question {}'.format(i),
+            'answer': 'Batch answer',
+            'difficulty': 1 + i % 5,
+            'category': 1 + i % 6}) for i in range(20)]
+        lines.insert(3, '{not json')
+        lines.insert(6, json.dumps({'question': 'Batch question', 'answer': 'Batch answer', 'difficulty': 9, 'category': 1}))
+        num1 = Question.query.count()
+        response = self.client().post('/questions/batch',data='\n'.join(lines),content_type='application/x-ndjson')
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertTrue(data.get('success'))
+        self.assertEqual(data.get('created'),20)
+        self.assertEqual(data.get('failed'),2)
+        self.assertEqual([e['line'] for e in data.get('errors')],[4,7])
+        self.assertEqual(num1+20,Question.query.count())
+
+        ids = [q.id for q in Question.query.filter(Question.question.like('Batch question %')).all()]
+        response = self.client().delete('/questions',json={'ids': ids + [99999]})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(sorted(data.get('deleted')),sorted(ids))
+        self.assertEqual(data.get('errors'),[{'id': 99999, 'error': 'not found'}])
+        self.assertEqual(num1,Question.query.count())
+
+    def test_create_question_batch_reports_rejected_lines(self):
+        lines = [json.dumps({
+            'question': 'Rejected question' if i in (2, 5) else 'Batch question {}'.format(i),
+            'answer': 'Batch answer',
+            'difficulty': 1,
+            'category': 1}) for i in range(8)]
+        execute = db.session.execute
+
+        def reject(statement, rows=None):
+            if rows and any(row['question'] == 'Rejected question' for row in rows):
+                raise IntegrityError('INSERT', {}, None)
+            return execute(statement, rows)
+
+        num1 = Question.query.count()
+        with mock.patch.object(db.session, 'execute', side_effect=reject):
+            response = self.client().post('/questions/batch',data='\n'.join(lines),content_type='application/x-ndjson')
+        for q in Question.query.filter(Question.question.like('Batch question %')).all():
+            self.addCleanup(q.delete)
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(data.get('created'),6)
+        self.assertEqual([e['line'] for e in data.get('errors')],[3,6])
+        self.assertEqual(num1+6,Question.query.count())
+
+    def test_create_question_batch_without_valid_lines(self):
+        response = self.client().post('/questions/batch',data='{not json\n[]',content_type='application/x-ndjson')
+        self.assertEqual(response.status_code,422)
+        self.assertFalse(response.json.get('success'))
+
+    def test_delete_question_batch_not_found(self):
+        response = self.client().delete('/questions',json={'ids': [99998, 99999]})
+        self.assertEqual(response.status_code,404)
+        self.assertFalse(response.json.get('success'))
+
+    def test_create_empty_question_batch(self):
+        response = self.client().post('/questions/batch',data='',content_type='application/x-ndjson')
+        self.assertEqual(response.status_code,400)
+        self.assertFalse(response.json.get('success'))
+
+    def test_delete_question_batch_without_ids(self):
+        for body in ({}, {'ids': []}, {'ids': ['1']}):
+            response = self.client().delete('/questions',json=body)
+            self.assertEqual(response.status_code,400)
+            self.assertFalse(response.json.get('success'))
+
+    def test_delete_question_batch_database_error(self):
+        with mock.patch('flaskr.delete_questions', side_effect=OperationalError('DELETE', {}, None)):
+            response = self.client().delete('/questions',json={'ids': [1]})
+        self.assertEqual(response.status_code,422)
+        self.assertEqual(response.json.get('error'),422)
+
     def test_create_question_without_enough_information(self):
         question_wo_question = {
             'answer': 'Lilly and Goldi',
@@ -160,6 +288,66 @@ class TriviaTestCase(unittest.TestCase):
         for q in questions:
             self.assertTrue(str(q['question']).find(search) != -1 or str(q['answer']).find(search) != -1)
 
+    def test_search_questions_highlights_matches(self):
+        response = self.client().post('/questions',json={'searchTerm':'Anne Rice'})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(data.get('total_questions'),len(data.get('questions')))
+        question = data.get('questions')[0]
+        self.assertIn('<mark>Anne</mark>',question['highlight']['question'])
+        self.assertIn('<mark>Rice</mark>',question['highlight']['question'])
+        self.assertNotIn('<mark>',question['question'])
+
+    def test_search_questions_escapes_highlight(self):
+        question = Question(question='<img src=x onerror=alert(1)> Escapable', answer='<b>Escapable</b>', category='1', difficulty=1)
+        question.insert()
+        self.addCleanup(question.delete)
+        response = self.client().post('/questions',json={'searchTerm':'escapable'})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        highlight = data.get('questions')[0]['highlight']
+        self.assertEqual(highlight['question'],'&lt;img src=x onerror=alert(1)&gt; <mark>Escapable</mark>')
+        self.assertEqual(highlight['answer'],'&lt;b&gt;<mark>Escapable</mark>&lt;/b&gt;')
+
+    def test_search_questions_by_stop_word(self):
+        response = self.client().post('/questions',json={'searchTerm':'the'})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertGreater(len(data.get('questions')),0)
+        for q in data.get('questions'):
+            self.assertIn('<mark>', q['highlight']['question'] + str(q['highlight']['answer']))
+
+    def test_search_questions_by_word_prefix(self):
+        response = self.client().post('/questions',json={'searchTerm':'act'})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertIn('actor',[q['question'] for q in data.get('questions')][0])
+
+    def test_search_questions_by_cursor(self):
+        for i in range(12):
+            question = Question(question='Searchable question {}'.format(i), answer='Searchable answer', category='1', difficulty=1)
+            question.insert()
+            self.addCleanup(question.delete)
+        response = self.client().post('/questions',json={'searchTerm':'searchable'})
+        data = response.json
+        self.assertGreaterEqual(data.get('total_questions'),12)
+        cursor = data.get('next_cursor')
+        self.assertIsNotNone(cursor)
+
+        response = self.client().post('/questions?cursor={}'.format(cursor),json={'searchTerm':'searchable'})
+        next_data = response.json
+        self.assertEqual(response.status_code,200)
+        qids = [q['id'] for q in data.get('questions') + next_data.get('questions')]
+        self.assertEqual(len(qids),len(set(qids)))
+        self.assertEqual(len(qids),data.get('total_questions'))
+
+    def test_search_questions_with_list_cursor(self):
+        response = self.client().get('/questions')
+        cursor = response.json.get('next_cursor')
+        response = self.client().post('/questions?cursor={}'.format(cursor),json={'searchTerm':'actor'})
+        self.assertEqual(response.status_code,400)
+        self.assertFalse(response.json.get('success'))
+
     def test_get_questions_of_category(self):
         cat_id = 2
         response = self.client().get('/categories/{}/questions'.format(cat_id))
@@ -191,7 +379,38 @@ class TriviaTestCase(unittest.TestCase):
             if next_question:
                 self.assertNotIn(response.json.get('question')['id'],previous_questions)
                 previous_questions.append(response.json.get('question')['id'])
-        
+
+    def test_quiz_session(self):
+        category = {'id':2, 'type': 'Art'}
+        response = self.client().post('/quizzes/sessions',json={'quiz_category':category})
+        data = response.json
+        self.assertEqual(response.status_code,200)
+        self.assertTrue(data.get('success'))
+        self.assertEqual(data.get('total_questions'),Question.query.filter(Question.category==2).count())
+
+        asked = []
+        while True:
+            response = self.client().post('/quizzes',json={'session_id':data.get('session_id')})
+            self.assertEqual(response.status_code,200)
+            question = response.json.get('question')
+            if question is None:
+                break
+            self.assertEqual(int(question['category']),2)
+            self.assertNotIn(question['id'],asked)
+            asked.append(question['id'])
+        self.assertEqual(len(asked),data.get('total_questions'))
+
+    def test_quiz_session_length(self):
+        response = self.client().post('/quizzes/sessions',json={'quiz_category':{'id':0},'length':3})
+        self.assertEqual(response.status_code,200)
+        self.assertEqual(response.json.get('total_questions'),3)
+
+    def test_quiz_unknown_session(self):
+        response = self.client().post('/quizzes',json={'session_id':'no-such-session'})
+        data = response.json
+        self.assertEqual(response.status_code,404)
+        self.assertFalse(data.get('success'))
+        self.assertEqual(data.get('error'),404)
         
 
 #    """